@@ -19,11 +19,11 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import os
-import queue
 import sys
 from pathlib import Path
 import yaml
 
+from library.lcd.update_queue import UpdateQueue
 from library.log import logger
 
 
@@ -82,4 +82,4 @@ def check_theme_compatible(display_size: str):
 load_theme()
 
 # Queue containing the serial requests to send to the screen
-update_queue = queue.Queue()
+update_queue = UpdateQueue()
@@ -88,6 +88,22 @@ class Display:
         else:
             logger.error("Unknown display revision '", config.CONFIG_DATA["display"]["REVISION"], "'")
 
+        # Only send to the display the areas of the bitmaps that have changed since previous refresh
+        if self.lcd and config.CONFIG_DATA["display"].get("DIFF_UPDATES", False):
+            self.lcd.enable_framebuffer()
+
+        # Draw all bitmaps off-screen, and send them together to the display once per frame
+        if self.lcd and config.CONFIG_DATA["display"].get("COMPOSITOR", False):
+            self.lcd.enable_compositor()
+
+        # Limit the memory used by the decoded images of the theme
+        if self.lcd:
+            self.lcd.image_cache.max_bytes = config.CONFIG_DATA["display"].get("IMAGE_CACHE_SIZE", 64) * 1024 * 1024
+
+        # Draw radial progress bars for all their values in the background when they are first displayed
+        if self.lcd and config.CONFIG_DATA["display"].get("RADIAL_PRERENDER", False):
+            self.lcd.radial_prerender = True
+
     def initialize_display(self):
         # Reset screen in case it was in an unstable state (screen is also cleared)
         self.lcd.Reset()
@@ -105,6 +121,9 @@ class Display:
         # Turn screen on in case it was turned off previously
         self.lcd.ScreenOn()
 
+        # Some models do not display back the previous bitmap after being turned off/on: everything must be redrawn
+        self.lcd.invalidate_screen()
+
         # Set brightness
         self.lcd.SetBrightness(config.CONFIG_DATA["display"]["BRIGHTNESS"])
 
@@ -0,0 +1,197 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Scheduler of the periodic jobs (stats refresh, display flush), independent of the jobs themselves
+
+import bisect
+import heapq
+import itertools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from library.log import logger
+
+# Upper bounds of the buckets of the latency and jitter histograms, in seconds. Last bucket is above all bounds
+HISTOGRAM_BOUNDS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(HISTOGRAM_BOUNDS, value)] += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def to_dict(self) -> Dict[str, Any]:
+        count = sum(self.counts)
+        return {
+            "buckets": dict(zip([f"<={bound}s" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}s"],
+                                self.counts)),
+            "mean": self.total / count if count else 0.0,
+            "max": self.max,
+        }
+
+
+class Job:
+    def __init__(self, func: Callable, interval: float, deadline: float, histories: Sequence[List[float]] = ()):
+        self.func = func
+        self.interval = interval
+        self.deadline = deadline  # Time of the next run, runs are always at deadline + N * interval
+
+        # Histories of the values read by the job, to adapt its interval to their volatility
+        self.histories = histories
+        self.multiplier = 1  # Job runs every multiplier * interval
+
+        # Statistics
+        self.runs = 0
+        self.skipped = 0  # Runs skipped because the previous run ended too late
+        self.latency = Histogram()  # Delay between the deadline and the start of the runs
+        self.jitter = Histogram()  # Variation of the latency between two consecutive runs
+        self.previous_latency = None
+
+
+class Scheduler:
+    # Run all periodic jobs from a single thread: jobs are kept in a heap ordered by their next deadline, and run by a
+    # small pool of worker threads so that a job blocked on a slow sensor read does not delay the others.
+    # Deadlines use the monotonic clock, so that changes of the system time do not affect the jobs, and are absolute
+    # so that the runs do not drift. A job is never run again before its previous run is over: if a run ends after
+    # the next deadlines, the job runs again right away for the last one, and the older late runs are skipped.
+    # With adaptive intervals, jobs whose values are stable run less often, up to every max_interval seconds
+    def __init__(self, workers: int, adaptive_max_interval: float = 0, adaptive_threshold: float = 5,
+                 stopping: Callable[[], bool] = lambda: False):
+        self.jobs: List[Tuple[float, int, Job]] = []  # Heap of (deadline, order, job)
+        self.order = itertools.count()  # Jobs with the same deadline are run in the order they have been scheduled
+        self.all_jobs: List[Job] = []
+        self.condition = threading.Condition()
+        self.workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Scheduler_Worker")
+        self.thread = None
+
+        # Origin of the phases of the jobs
+        self.start_time = time.monotonic()
+
+        # Maximum interval of jobs with adaptive intervals, in seconds (0: adaptive intervals are disabled), and maximum
+        # change of their values to be considered stable, in percent of the largest value of their history
+        self.adaptive_max_interval = adaptive_max_interval
+        self.adaptive_threshold = adaptive_threshold
+
+        # When the program is stopping, jobs are not run anymore
+        self.stopping = stopping
+
+    def add(self, func: Callable, interval: float, phase: Optional[float] = None,
+            histories: Sequence[List[float]] = ()):
+        # Run a job every interval (in seconds). Without phase, the job runs now then every interval. With a phase, the
+        # job runs at phase + N * interval seconds from the start of the scheduler: jobs with the same interval and
+        # different phases never run at the same time.
+        # Histories are the lists of last values updated by the job: if adaptive intervals are enabled, the job runs
+        # every 2, 4, 8... intervals while the values are stable, and every interval again as soon as they change
+        now = time.monotonic()
+        if phase is None:
+            deadline = now
+        else:
+            deadline = self.start_time + phase
+            deadline += max(math.ceil((now - deadline) / interval), 0) * interval
+
+        with self.condition:
+            job = Job(func, interval, deadline, histories)
+            self.all_jobs.append(job)
+            self._push(job)
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="Scheduler", daemon=True)
+                self.thread.start()
+
+    def get_statistics(self) -> Dict[str, Dict[str, Any]]:
+        # Number of runs, skipped runs, latency and jitter histograms of all jobs, by job name
+        with self.condition:
+            return {job.func.__name__: {"interval": job.interval * job.multiplier,
+                                        "runs": job.runs,
+                                        "skipped": job.skipped,
+                                        "latency": job.latency.to_dict(),
+                                        "jitter": job.jitter.to_dict()} for job in self.all_jobs}
+
+    def _push(self, job: Job):
+        heapq.heappush(self.jobs, (job.deadline, next(self.order), job))
+        self.condition.notify()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                while not self.jobs or self.jobs[0][0] > time.monotonic():
+                    self.condition.wait(self.jobs[0][0] - time.monotonic() if self.jobs else None)
+                _, _, job = heapq.heappop(self.jobs)
+
+            if not self.stopping():
+                try:
+                    self.workers.submit(self._run_job, job)
+                except RuntimeError:
+                    # Interpreter is shutting down: no new job can be run
+                    return
+
+    def _run_job(self, job: Job):
+        start = time.monotonic()
+        try:
+            job.func()
+        except Exception:
+            logger.exception(f"Scheduled job {job.func.__name__} failed")
+        end = time.monotonic()
+
+        with self.condition:
+            latency = start - job.deadline
+            job.runs += 1
+            job.latency.add(latency)
+            if job.previous_latency is not None:
+                job.jitter.add(abs(latency - job.previous_latency))
+            job.previous_latency = latency
+
+            if not self.stopping():
+                # If the program is not stopping: re-schedule the job for its next deadline, or for the last deadline
+                # that has passed if it is late (e.g. jobs reading a sensor during a whole interval)
+                self._adapt_interval(job)
+                interval = job.interval * job.multiplier
+                late_runs = max(math.floor((end - job.deadline) / interval) - 1, 0)
+                job.skipped += late_runs
+                job.deadline += (late_runs + 1) * interval
+                self._push(job)
+
+    def _adapt_interval(self, job: Job):
+        if not self.adaptive_max_interval or not job.histories:
+            return
+
+        if all(_is_stable(history, self.adaptive_threshold) for history in job.histories):
+            # Back off, staying on the deadlines of the initial interval
+            job.multiplier = max(min(job.multiplier * 2, math.floor(self.adaptive_max_interval / job.interval)), 1)
+        else:
+            job.multiplier = 1
+
+
+def _is_stable(history: List[float], threshold: float) -> bool:
+    # Last value of the history differs from the previous one by less than threshold % of the largest value.
+    # Histories without any value (sensor not available) do not prevent the job from backing off
+    largest = max((abs(value) for value in history if not math.isnan(value)), default=None)
+    if largest is None:
+        return True
+    values = history[-2:]
+    if len(values) < 2 or any(math.isnan(value) for value in values):
+        return False
+    return abs(values[1] - values[0]) <= largest * threshold / 100
@@ -0,0 +1,85 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Off-screen canvas where widgets are drawn, then sent to the screen all together once per frame
+
+import threading
+from typing import List, Tuple
+
+from PIL import Image
+
+from library.lcd.box import Box, area
+
+
+class Compositor:
+    def __init__(self, width: int, height: int, merge_threshold: int = 2048):
+        self.width = width
+        self.height = height
+
+        # Two dirty areas are sent as one bitmap if it only costs this number of extra pixels or less
+        self.merge_threshold = merge_threshold
+
+        # Screen is white after being cleared
+        self.canvas = Image.new("RGB", (width, height), (255, 255, 255))
+
+        # Areas of the canvas that have been drawn since last flush
+        self.dirty: List[Box] = []
+
+        self.lock = threading.Lock()
+
+    def paste(self, image: Image.Image, x: int, y: int):
+        with self.lock:
+            self.canvas.paste(image, (x, y))
+            self.dirty.append((x, y, x + image.size[0], y + image.size[1]))
+
+    def flush(self) -> List[Tuple[Image.Image, int, int]]:
+        # Get the bitmaps to send to the screen for all areas drawn since last flush, and their position
+        with self.lock:
+            boxes = merge_boxes(self.dirty, self.merge_threshold)
+            self.dirty = []
+            return [(self.canvas.crop(box), box[0], box[1]) for box in boxes]
+
+
+def merge_boxes(boxes: List[Box], merge_threshold: int = 0) -> List[Box]:
+    # Merge overlapping and close boxes, as long as the merged box does not contain more than merge_threshold pixels
+    # that were not in the original boxes
+    boxes = list(boxes)
+    merged = True
+    while merged:
+        merged = False
+        for i in range(len(boxes)):
+            for j in range(i + 1, len(boxes)):
+                a, b = boxes[i], boxes[j]
+                union = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                covered = area(a) + area(b) - area(_intersection(a, b))
+                if area(union) - covered <= merge_threshold:
+                    boxes[i] = union
+                    del boxes[j]
+                    merged = True
+                    break
+            if merged:
+                break
+    return boxes
+
+
+def _intersection(a: Box, b: Box) -> Box:
+    left, top = max(a[0], b[0]), max(a[1], b[1])
+    right, bottom = min(a[2], b[2]), min(a[3], b[3])
+    if right <= left or bottom <= top:
+        return 0, 0, 0, 0
+    return left, top, right, bottom
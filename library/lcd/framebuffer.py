@@ -0,0 +1,88 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Shadow copy of the pixels displayed on the screen, used to only send to the screen the areas that have changed
+
+import threading
+from typing import List
+
+import numpy as np
+
+from library.lcd.box import Box, area
+
+
+class Framebuffer:
+    def __init__(self, width: int, height: int, merge_threshold: int = 2048):
+        self.width = width
+        self.height = height
+
+        # Two dirty areas are sent as one bitmap if it only costs this number of unchanged pixels or less:
+        # each bitmap has a cost (command header, cooldown...) that is worth more than a few pixels
+        self.merge_threshold = merge_threshold
+
+        # RGB pixels currently displayed on the screen
+        self.pixels = np.zeros((height, width, 3), dtype=np.uint8)
+        # Pixels for which we know what is displayed on the screen: unknown pixels are always sent
+        self.known = np.zeros((height, width), dtype=bool)
+
+        # Lock to hold while comparing a bitmap with the framebuffer and sending it, so that the framebuffer content
+        # stays in sync with the order of the requests sent to the screen
+        self.lock = threading.RLock()
+
+    def invalidate(self):
+        # Screen content is not known anymore: next bitmaps will be sent entirely
+        self.known[:] = False
+
+    def dirty_rectangles(self, rgb: np.ndarray, x: int, y: int) -> List[Box]:
+        # Compare a RGB bitmap (numpy array of shape (height, width, 3)) to be displayed at (x, y) with the screen
+        # content, and return the list of areas (in screen coordinates) that need to be sent to the screen
+        height, width = rgb.shape[0], rgb.shape[1]
+        changed = np.any(rgb != self.pixels[y:y + height, x:x + width], axis=2)
+        changed |= ~self.known[y:y + height, x:x + width]
+
+        changed_rows = np.flatnonzero(np.any(changed, axis=1))
+        if changed_rows.size == 0:
+            # Bitmap is identical to what is displayed on the screen
+            return []
+
+        # Group changed rows into bands separated by unchanged rows, and get the changed columns for each band
+        band_limits = np.flatnonzero(np.diff(changed_rows) > 1)
+        band_starts = np.concatenate(([changed_rows[0]], changed_rows[band_limits + 1]))
+        band_ends = np.concatenate((changed_rows[band_limits], [changed_rows[-1]])) + 1
+
+        boxes = []
+        for top, bottom in zip(band_starts, band_ends):
+            changed_cols = np.flatnonzero(np.any(changed[top:bottom], axis=0))
+            box = (int(changed_cols[0]), int(top), int(changed_cols[-1]) + 1, int(bottom))
+
+            if boxes:
+                # Merge with previous band if it does not cost too many unchanged pixels
+                prev = boxes[-1]
+                merged = (min(prev[0], box[0]), prev[1], max(prev[2], box[2]), box[3])
+                if area(merged) - area(prev) - area(box) <= self.merge_threshold:
+                    boxes[-1] = merged
+                    continue
+            boxes.append(box)
+
+        return [(left + x, top + y, right + x, bottom + y) for left, top, right, bottom in boxes]
+
+    def update(self, rgb: np.ndarray, x: int, y: int):
+        # Store a RGB bitmap sent to the screen at (x, y)
+        height, width = rgb.shape[0], rgb.shape[1]
+        self.pixels[y:y + height, x:x + width] = rgb
+        self.known[y:y + height, x:x + width] = True
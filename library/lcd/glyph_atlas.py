@@ -0,0 +1,190 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Text rendering from cached glyph masks: texts displayed by a system monitor are made of the same few characters
+# (digits, units...), so their masks are rasterized once by FreeType then assembled for each new text.
+# Rendered pixels are identical to ImageDraw.text() with the basic layout engine. Texts that need the complex layout
+# engine (Raqm), multiline texts and characters outside Latin-1 are not supported: use ImageDraw.text() for them
+
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageFont
+
+from library.lcd.color import RGBColor
+from library.lcd.box import Box
+
+
+class Glyph(NamedTuple):
+    mask: np.ndarray  # Coverage of the glyph pixels (0-255), can be empty
+    x: int  # Position of the mask from the pen position on the baseline
+    y: int
+    advance: Optional[int]  # Pen move after this glyph, None if not a whole number of pixels
+
+
+class GlyphAtlas:
+    def __init__(self, font: ImageFont.FreeTypeFont):
+        self.font = font
+
+        self.glyphs: Dict[str, Glyph] = {}  # { key=character, value=Glyph }
+        self.kerning: Dict[str, float] = {}  # { key=pair of characters, value=pen adjustment between them }
+        self.vertical_anchors: Dict[str, int] = {}  # { key=vertical anchor, value=baseline position from it }
+
+        # Statistics
+        self.drawn = 0  # Texts drawn from glyphs
+        self.unsupported = 0  # Texts that must be drawn with ImageDraw.text()
+
+    def supports(self, text: str, anchor: str = "la") -> bool:
+        return (self.font.layout_engine == ImageFont.Layout.BASIC
+                and len(anchor) == 2 and anchor[0] in "lmr" and anchor[1] in "asdmtb"
+                and len(text) > 0 and all(" " <= c <= "~" or "\xa0" <= c <= "\xff" for c in text))
+
+    def getbbox(self, text: str, anchor: str = "la") -> Optional[Tuple[int, int, int, int]]:
+        # Get the bounding box of the text from the anchor point, like ImageFont.getbbox(), or None if not supported
+        layout = self._layout(text, anchor)
+        if layout is None:
+            return None
+        glyphs, pen, (left, top, right, bottom) = layout
+        x, y = self._anchor(anchor, pen, top, bottom)
+        return x + min(left, 0), y + top, x + max(right, pen), y + bottom
+
+    def getmask(self, text: str, anchor: str = "la") -> Optional[Tuple[np.ndarray, int, int]]:
+        # Get the mask of the text and its position from the anchor point, like ImageFont.getmask2(), or None if not
+        # supported
+        layout = self._layout(text, anchor)
+        if layout is None:
+            return None
+        glyphs, pen, (left, top, right, bottom) = layout
+
+        # Assemble glyph masks: overlapping pixels are combined like FreeType bitmaps in Pillow
+        mask = np.zeros((bottom - top, right - left), dtype=np.uint8)
+        for x, y, glyph_mask in glyphs:
+            area = mask[y - top:y - top + glyph_mask.shape[0], x - left:x - left + glyph_mask.shape[1]]
+            if area.any():
+                area[...] = glyph_mask + _mul_div_255(area, 255 - glyph_mask)
+            else:
+                area[...] = glyph_mask
+
+        x, y = self._anchor(anchor, pen, top, bottom)
+        return mask, x + left, y + top
+
+    def draw(self, image: Image.Image, xy: Tuple[int, int], text: str, fill: RGBColor, anchor: str = "la") -> bool:
+        # Draw the text on an RGB/RGBA image like ImageDraw.text(), return False if the text is not supported
+        mask = self.getmask(text, anchor) if image.mode in ["RGB", "RGBA"] else None
+        if mask is None:
+            self.unsupported += 1
+            return False
+        self.drawn += 1
+        mask, x, y = mask
+        x += int(xy[0])
+        y += int(xy[1])
+
+        # Keep only the part of the text inside the image
+        left, top = max(x, 0), max(y, 0)
+        right, bottom = min(x + mask.shape[1], image.width), min(y + mask.shape[0], image.height)
+        if left >= right or top >= bottom:
+            return True
+        mask = mask[top - y:bottom - y, left - x:right - x]
+
+        # Blend text color with the background, with the same rounding as Pillow
+        background = np.asarray(image.crop((left, top, right, bottom)), dtype=np.int32)
+        ink = np.array(fill + (255,) * (background.shape[2] - len(fill)), dtype=np.int32)
+        alpha = np.repeat(mask[:, :, np.newaxis].astype(np.int32), background.shape[2], axis=2)
+        if image.mode == "RGBA":
+            # Color of fully transparent background pixels is replaced by text color
+            alpha[:, :, :3][(background[:, :, 3] == 0) & (mask != 0)] = 255
+        blended = _div_255(background * (255 - alpha) + ink * alpha)
+        image.paste(Image.fromarray(blended.astype(np.uint8), image.mode), (left, top))
+        return True
+
+    def _layout(self, text: str, anchor: str) -> Optional[Tuple[List[Tuple[int, int, np.ndarray]], int, Box]]:
+        # Get the position of the glyph masks from the start of the baseline, the pen position at the end of the text and
+        # the bounding box of the masks, or None if the text cannot be assembled from glyphs without changing its
+        # rendering
+        if not self.supports(text, anchor):
+            return None
+
+        glyphs = []
+        pen = 0
+        for i, c in enumerate(text):
+            glyph = self._glyph(c)
+            if glyph.advance is None or (i > 0 and self._kerning(text[i - 1:i + 1])):
+                return None
+            if glyph.mask.size:
+                glyphs.append((pen + glyph.x, glyph.y, glyph.mask))
+            pen += glyph.advance
+
+        if not glyphs:
+            return glyphs, pen, (0, 0, 0, 0)
+        return glyphs, pen, (min(x for x, _, _ in glyphs),
+                             min(y for _, y, _ in glyphs),
+                             max(x + mask.shape[1] for x, _, mask in glyphs),
+                             max(y + mask.shape[0] for _, y, mask in glyphs))
+
+    def _anchor(self, anchor: str, pen: int, top: int, bottom: int) -> Tuple[int, int]:
+        # Position of the start of the baseline from the anchor point
+        if anchor[0] == "l":
+            x = 0
+        elif anchor[0] == "m":
+            x = -((pen + 1) // 2)
+        else:
+            x = -pen
+
+        if anchor[1] == "t":
+            y = -top
+        elif anchor[1] == "b":
+            y = -bottom
+        else:
+            y = self._vertical_anchor(anchor[1])
+
+        return x, y
+
+    def _glyph(self, c: str) -> Glyph:
+        glyph = self.glyphs.get(c)
+        if glyph is None:
+            mask, (x, y) = self.font.getmask2(c, "L", anchor="ls")
+            advance = self.font.getlength(c)
+            glyph = Glyph(np.array(mask, dtype=np.uint8).reshape(mask.size[1], mask.size[0]), x, y,
+                          int(advance) if advance.is_integer() else None)
+            self.glyphs[c] = glyph
+        return glyph
+
+    def _kerning(self, pair: str) -> float:
+        kerning = self.kerning.get(pair)
+        if kerning is None:
+            kerning = self.font.getlength(pair) - self.font.getlength(pair[0]) - self.font.getlength(pair[1])
+            self.kerning[pair] = kerning
+        return kerning
+
+    def _vertical_anchor(self, anchor: str) -> int:
+        # Ascender, descender and middle anchors only depend on the font metrics
+        y = self.vertical_anchors.get(anchor)
+        if y is None:
+            y = self.font.getbbox("0", anchor="l" + anchor)[1] - self.font.getbbox("0", anchor="ls")[1]
+            self.vertical_anchors[anchor] = y
+        return y
+
+
+def _div_255(a: np.ndarray) -> np.ndarray:
+    # a / 255, rounded like Pillow
+    tmp = a + 128
+    return ((tmp >> 8) + tmp) >> 8
+
+
+def _mul_div_255(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return _div_255(a.astype(np.int32) * b)
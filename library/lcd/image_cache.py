@@ -0,0 +1,119 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Cache of images loaded from the filesystem, to avoid opening and decoding them every time
+
+import threading
+from collections import OrderedDict
+from typing import Callable, Tuple, Union
+
+from PIL import Image
+
+from library.log import logger
+
+# Images are cached by path, their cropped areas by (path, box), and other images by any tuple
+Key = Union[str, Tuple]
+
+
+class ImageCache:
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        # Maximum size of the decoded pixels in the cache: least recently used images are removed above this size
+        self.max_bytes = max_bytes
+
+        # { key=path or (path, box), value=decoded RGB/RGBA image or area of this image }
+        self.images: OrderedDict[Key, Image.Image] = OrderedDict()
+        self.size = 0
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.lock = threading.Lock()
+
+    def __contains__(self, key: Key) -> bool:
+        return key in self.images
+
+    def get(self, path: str) -> Image.Image:
+        # Get the image from the cache, or load it. This image is shared: it must not be modified
+        return self.get_or_load(path, lambda: _load(path))
+
+    def open(self, path: str) -> Image.Image:
+        # Get a copy of the image, that can be modified
+        return self.get(path).copy()
+
+    def tile(self, path: str, box: Tuple[int, int, int, int]) -> Image.Image:
+        # Get an area of the image, cached separately so that widgets drawn at the same place every time do not crop the
+        # whole image again. This tile is shared: it must not be modified
+        return self.get_or_load((path, tuple(box)), lambda: self.get(path).crop(box))
+
+    def crop(self, path: str, box: Tuple[int, int, int, int]) -> Image.Image:
+        # Get a copy of an area of the image, that can be modified. Only the cropped pixels are copied
+        return self.tile(path, box).copy()
+
+    def clear(self):
+        with self.lock:
+            self.images.clear()
+            self.size = 0
+
+    def get_or_load(self, key: Key, load: Callable[[], Image.Image]) -> Image.Image:
+        # Get an image from the cache, or create it with the load function and keep it in the cache. Used for images
+        # that are not files, e.g. bitmaps drawn once then reused. This image is shared: it must not be modified
+        with self.lock:
+            image = self.images.get(key)
+            if image is not None:
+                self.hits += 1
+                self.images.move_to_end(key)
+                return image
+            self.misses += 1
+
+        image = load()
+
+        with self.lock:
+            if key not in self.images:
+                if isinstance(key, str):
+                    logger.debug("Bitmap " + key + " is now loaded in the cache")
+                self.images[key] = image
+                self.size += _size(image)
+                self._evict()
+            return image
+
+    def _evict(self):
+        # Remove least recently used images until the cache size is below the limit, but always keep the last one
+        while self.size > self.max_bytes and len(self.images) > 1:
+            key, image = self.images.popitem(last=False)
+            self.size -= _size(image)
+            self.evictions += 1
+            if isinstance(key, str):
+                logger.debug("Bitmap " + key + " has been removed from the cache")
+
+
+def _load(path: str) -> Image.Image:
+    # Open the image and decode all its pixels now, in a mode that can be sent to the display without conversion
+    with Image.open(path) as image:
+        if image.mode in ["RGB", "RGBA"]:
+            image.load()
+            return image.copy()
+        elif "A" in image.getbands() or "transparency" in image.info:
+            return image.convert("RGBA")
+        else:
+            return image.convert("RGB")
+
+
+def _size(image: Image.Image) -> int:
+    return image.width * image.height * len(image.getbands())
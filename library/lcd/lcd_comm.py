@@ -16,7 +16,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-import copy
 import math
 import os
 import platform
@@ -26,13 +25,31 @@ import threading
 import time
 from abc import ABC, abstractmethod
 from enum import IntEnum
-from typing import Tuple, List, Optional, Dict
+from typing import Tuple, List, Optional, Dict, Union
 
+import numpy as np
 import serial
 from PIL import Image, ImageDraw, ImageFont
 
 from library.log import logger
 from library.lcd.color import Color, parse_color
+from library.lcd.compositor import Compositor
+from library.lcd.framebuffer import Framebuffer
+from library.lcd.glyph_atlas import GlyphAtlas
+from library.lcd.image_cache import ImageCache
+from library.lcd.line_graph import LineGraph
+from library.lcd.text_cache import TextCache
+from library.lcd.update_queue import UpdateQueue
+from library.lcd.widget_states import WidgetStates
+
+
+# Size of the serial writes for bulk data: a multiple of the USB CDC packet size (64 bytes), big enough to limit the
+# number of system calls
+SERIAL_WRITE_SIZE = 64 * 256
+
+# macOS needs the serial buffer to be flushed regularly (see WriteLine): writes are kept as small as the 8 lines of
+# a 320 pixels wide bitmap that were written before bulk writes
+SERIAL_WRITE_SIZE_DARWIN = 64 * 40
 
 
 class Orientation(IntEnum):
@@ -65,8 +82,33 @@ class LcdComm(ABC):
         # mixed with other requests in-between
         self.update_queue_mutex = threading.Lock()
 
-        # Create a cache to store opened images, to avoid opening and loading from the filesystem every time
-        self.image_cache = {}  # { key=path, value=PIL.Image }
+        # Create a cache to store opened images, to avoid opening and decoding them from the filesystem every time
+        self.image_cache = ImageCache()
+
+        # Create a cache to store the glyphs of opened fonts, to draw texts without rasterizing all their characters
+        # { key=(font, size), value=GlyphAtlas, or None if the font cannot use one }
+        self.glyph_atlases: Dict[Tuple[str, int], Optional[GlyphAtlas]] = {}
+
+        # Create a cache to store rendered texts, and the texts currently displayed on the screen
+        self.text_cache = TextCache()
+
+        # Value and configuration of the widgets currently displayed, to skip redrawing unchanged widgets
+        self.widget_states = WidgetStates()
+
+        # Plots of the line graphs currently displayed, updated incrementally when new values are added
+        self.line_graphs: Dict[Tuple, LineGraph] = {}  # { key=(x, y, width, height, orientation), value=LineGraph }
+        # Progress bars currently displayed, only their changed columns are sent when their value changes
+        self.progress_bars: Dict[Tuple, Tuple[Tuple, int]] = {}  # { key=(x, y, width, height, orientation),
+        #                                                            value=(configuration, number of filled columns) }
+        self.widgets_lock = threading.Lock()
+
+        # Radial progress bars for which the bitmaps of all values are drawn in the background when they are first
+        # displayed, instead of one by one when each value is displayed. Disabled by default: set radial_prerender
+        self.radial_prerender = False
+        self.radial_sprite_sheets = set()
+
+        # Drawing context only used to get the size of texts before creating their bitmap
+        self.text_measure = ImageDraw.Draw(Image.new('RGB', (1, 1)))
 
         # Create a cache to store opened fonts, to avoid opening and loading from the filesystem every time
         self.font_cache: Dict[
@@ -74,6 +116,26 @@ class LcdComm(ABC):
             ImageFont.FreeTypeFont # value= a loaded freetype font
         ] = {}
 
+        # Shadow copy of the screen content, to only send the areas of the bitmaps that have changed.
+        # Disabled by default (None), call enable_framebuffer() to use it
+        self.framebuffer: Optional[Framebuffer] = None
+        self.framebuffer_orientation = self.orientation
+
+        # Off-screen canvas where bitmaps are drawn, to send them all together when FlushCompositor() is called.
+        # Disabled by default (None), call enable_compositor() to use it
+        self.compositor: Optional[Compositor] = None
+        self.compositor_orientation = self.orientation
+
+        # Buffer reused to serialize bitmaps when requests are done in sequence, see get_serialize_buffer()
+        self.serialize_buffer = bytearray()
+        # Buffers used alternately to serialize bitmaps when requests are queued: next bitmap is serialized in a buffer
+        # while previous one is being sent from the other buffer
+        self.free_serialize_buffers = [bytearray(), bytearray()]
+        self.free_serialize_buffers_cond = threading.Condition()
+
+        # Pending bitmaps in the update queue can be dropped if a newer bitmap redraws the same area before they are sent
+        self.coalesce_updates = True
+
     def get_width(self) -> int:
         if self.orientation == Orientation.PORTRAIT or self.orientation == Orientation.REVERSE_PORTRAIT:
             return self.display_width
@@ -86,6 +148,58 @@ class LcdComm(ABC):
         else:
             return self.display_width
 
+    def enable_framebuffer(self, enabled: bool = True):
+        if enabled:
+            self.framebuffer = Framebuffer(self.get_width(), self.get_height())
+            self.framebuffer_orientation = self.orientation
+        else:
+            self.framebuffer = None
+
+    def enable_compositor(self, enabled: bool = True):
+        if enabled:
+            self.compositor = Compositor(self.get_width(), self.get_height())
+            self.compositor_orientation = self.orientation
+        else:
+            self.compositor = None
+
+    def get_serialize_buffer(self, size: int) -> Optional[bytearray]:
+        # Get a buffer of at least size bytes to serialize a bitmap into, or None if a new buffer must be allocated:
+        # queued requests keep a reference to the serialized data until they are sent, so a buffer can only be reused
+        # when requests are done in sequence, or once the bitmap it contains has been sent
+        if not self.update_queue:
+            if len(self.serialize_buffer) < size:
+                # Do not resize the buffer in place: previous serialized data may still be referenced
+                self.serialize_buffer = bytearray(size)
+            return self.serialize_buffer
+
+        if not isinstance(self.update_queue, UpdateQueue) or not self.update_queue.in_batch():
+            return None
+
+        # Wait for a buffer to be free: if the display is slow, bitmaps are not serialized faster than they are sent
+        with self.free_serialize_buffers_cond:
+            while not self.free_serialize_buffers:
+                self.free_serialize_buffers_cond.wait()
+            buffer = self.free_serialize_buffers.pop()
+        if len(buffer) < size:
+            buffer = bytearray(size)
+        self.update_queue.add_done_callback(lambda: self._release_serialize_buffer(buffer))
+        return buffer
+
+    def _release_serialize_buffer(self, buffer: bytearray):
+        with self.free_serialize_buffers_cond:
+            self.free_serialize_buffers.append(buffer)
+            self.free_serialize_buffers_cond.notify()
+
+    def invalidate_screen(self):
+        # The screen content is not known anymore (screen cleared, reset, turned off...): everything will be redrawn
+        if self.framebuffer is not None:
+            self.framebuffer.invalidate()
+        self.text_cache.invalidate()
+        self.widget_states.invalidate()
+        with self.widgets_lock:
+            self.line_graphs.clear()
+            self.progress_bars.clear()
+
     def openSerial(self):
         if self.com_port == 'AUTO':
             self.com_port = self.auto_detect_com_port()
@@ -137,6 +251,33 @@ class LcdComm(ABC):
             # If no queue for async requests: do request now
             self.WriteLine(line)
 
+    def SendLines(self, lines: List[bytes]):
+        # Send multiple lines (e.g. all the data of a bitmap) as a single request, see WriteLines
+        if self.update_queue:
+            # Queue the request. Mutex is locked by caller to queue multiple lines
+            self.update_queue.put((self.WriteLines, [lines]))
+        else:
+            # If no queue for async requests: do request now
+            self.WriteLines(lines)
+
+    def WriteLines(self, lines: List[bytes]):
+        # Write lines in as few serial writes as possible: consecutive lines are gathered, and big lines are split, in
+        # blocks of SERIAL_WRITE_SIZE bytes. Lines that are views on the same buffer are not copied if not gathered
+        write_size = SERIAL_WRITE_SIZE_DARWIN if platform.system() == "Darwin" else SERIAL_WRITE_SIZE
+        block, block_size = [], 0
+        for line in lines:
+            line = memoryview(line).cast("B")
+            while len(line) > 0:
+                size = min(len(line), write_size - block_size)
+                block.append(line[:size])
+                block_size += size
+                line = line[size:]
+                if block_size == write_size:
+                    self.WriteLine(block[0] if len(block) == 1 else b''.join(block))
+                    block, block_size = [], 0
+        if block:
+            self.WriteLine(block[0] if len(block) == 1 else b''.join(block))
+
     def WriteLine(self, line: bytes):
         try:
             self.serial_write(line)
@@ -219,9 +360,103 @@ class LcdComm(ABC):
     ):
         pass
 
+    def UpdatePILImage(
+            self,
+            image: Image.Image,
+            x: int = 0, y: int = 0,
+            image_width: int = 0,
+            image_height: int = 0
+    ):
+        # Display an image like DisplayPILImage, but:
+        # - if the compositor is enabled, only draw the image off-screen: it will be sent on next FlushCompositor()
+        # - if the framebuffer is enabled, only send the areas of the image that are different from what is currently
+        #   displayed on the screen
+        # Texts and widgets displayed in this area are overwritten: they will be sent again even if they do not change
+        box = (x, y, x + (image_width or image.size[0]), y + (image_height or image.size[1]))
+        self.text_cache.forget(box)
+        self._forget_widgets(box)
+
+        if self.compositor is None and self.framebuffer is None:
+            self._display_pil_image(image, x, y, image_width, image_height)
+            return
+
+        # If the image height/width isn't provided, use the native image size
+        if not image_height:
+            image_height = image.size[1]
+        if not image_width:
+            image_width = image.size[0]
+
+        # Keep only the part of the image that is on the screen
+        image_width = min(image_width, image.size[0], self.get_width() - x)
+        image_height = min(image_height, image.size[1], self.get_height() - y)
+        if image_width <= 0 or image_height <= 0:
+            return
+        if image_width != image.size[0] or image_height != image.size[1]:
+            image = image.crop((0, 0, image_width, image_height))
+
+        if self.compositor is not None:
+            if self.compositor_orientation != self.orientation:
+                # Orientation has changed since the canvas was created: start again from a blank canvas
+                self.enable_compositor()
+            self.compositor.paste(image, x, y)
+        else:
+            self._send_pil_image(image, x, y)
+
+    def FlushCompositor(self):
+        # Send to the screen all the areas of the compositor canvas that have been drawn since last flush, merged in
+        # as few bitmaps as possible
+        if self.compositor is None:
+            return
+
+        for image, x, y in self.compositor.flush():
+            self._send_pil_image(image, x, y)
+
+    def _send_pil_image(self, image: Image.Image, x: int, y: int):
+        # Send an image that fits on the screen, through the framebuffer if enabled
+        if self.framebuffer is None:
+            self._display_pil_image(image, x, y)
+            return
+
+        rgb = image if image.mode == "RGB" else image.convert("RGB")
+        rgb = np.asarray(rgb)
+
+        with self.framebuffer.lock:
+            if self.framebuffer_orientation != self.orientation:
+                # Orientation has changed since the framebuffer was created: screen content is not valid anymore
+                self.enable_framebuffer()
+
+            for left, top, right, bottom in self.framebuffer.dirty_rectangles(rgb, x, y):
+                if (right - left, bottom - top) == image.size:
+                    self._display_pil_image(image, x, y)
+                else:
+                    self._display_pil_image(image.crop((left - x, top - y, right - x, bottom - y)), left, top)
+
+            self.framebuffer.update(rgb, x, y)
+
+    def _display_pil_image(
+            self,
+            image: Image.Image,
+            x: int = 0, y: int = 0,
+            image_width: int = 0,
+            image_height: int = 0
+    ):
+        # Call DisplayPILImage, and queue all its requests together as the update of an area of the screen
+        if not isinstance(self.update_queue, UpdateQueue):
+            self.DisplayPILImage(image, x, y, image_width, image_height)
+            return
+
+        region = None
+        if self.coalesce_updates:
+            right = min(x + (image_width or image.size[0]), self.get_width())
+            bottom = min(y + (image_height or image.size[1]), self.get_height())
+            region = (x, y, right, bottom)
+
+        with self.update_queue.batch(region):
+            self.DisplayPILImage(image, x, y, image_width, image_height)
+
     def DisplayBitmap(self, bitmap_path: str, x: int = 0, y: int = 0, width: int = 0, height: int = 0):
         image = self.open_image(bitmap_path)
-        self.DisplayPILImage(image, x, y, width, height)
+        self.UpdatePILImage(image, x, y, width, height)
 
     def DisplayText(
             self,
@@ -255,23 +490,40 @@ class LcdComm(ABC):
         if width > 0 and height == 0:
             height = font_size
 
-        if background_image is None:
-            # A text bitmap is created with max width/height by default : text with solid background
-            text_image = Image.new(
-                'RGB',
-                (self.get_width(), self.get_height()),
-                background_color
-            )
+        # Texts are only rendered if they are not in the cache, and only sent if they are different from the text
+        # currently displayed at the same place
+        place = (x, y, width, height, anchor, self.orientation)
+        key = (text, font, font_size, font_color, background_color, background_image, align) + place
+        if self.text_cache.is_displayed(place, key):
+            return
+
+        cached = self.text_cache.get(key)
+        if cached is None:
+            text_image, left, top = self._render_text(text, x, y, width, height, font, font_size, font_color,
+                                                      background_color, background_image, align, anchor)
+            self.text_cache.put(key, text_image, left, top)
         else:
-            # The text bitmap is created from provided background image : text with transparent background
-            text_image = self.open_image(background_image)
+            text_image, left, top = cached
+
+        self.UpdatePILImage(text_image, left, top)
+        self.text_cache.set_displayed(place, key, (left, top, left + text_image.width, top + text_image.height))
+
+    def _render_text(self, text: str, x: int, y: int, width: int, height: int, font: str, font_size: int,
+                     font_color: Tuple[int, int, int], background_color: Tuple[int, int, int],
+                     background_image: Optional[str], align: str, anchor: str) -> Tuple[Image.Image, int, int]:
+        # Get the bitmap of a text and its position on the screen
 
         # Get text bounding box
         ttfont = self.open_font(font, font_size)
-        d = ImageDraw.Draw(text_image)
+        glyph_atlas = self.open_glyph_atlas(font, font_size)
 
         if width == 0 or height == 0:
-            left, top, right, bottom = d.textbbox((x, y), text, font=ttfont, align=align, anchor=anchor)
+            bbox = glyph_atlas.getbbox(text, anchor) if glyph_atlas is not None else None
+            if bbox is not None:
+                left, top, right, bottom = x + bbox[0], y + bbox[1], x + bbox[2], y + bbox[3]
+            else:
+                left, top, right, bottom = self.text_measure.textbbox((x, y), text, font=ttfont, align=align,
+                                                                      anchor=anchor)
 
             # textbbox may return float values, which is not good for the bitmap operations below.
             # Let's extend the bounding box to the next whole pixel in all directions
@@ -294,19 +546,26 @@ class LcdComm(ABC):
             else:
                 y = top
 
-        # Draw text onto the background image with specified color & font
-        d.text((x, y), text, font=ttfont, fill=font_color, align=align, anchor=anchor)
-
         # Restrict the dimensions if they overflow the display size
         left = max(left, 0)
         top = max(top, 0)
         right = min(right, self.get_width())
         bottom = min(bottom, self.get_height())
 
-        # Crop text bitmap to keep only the text
-        text_image = text_image.crop(box=(left, top, right, bottom))
+        # The text bitmap only covers the text bounding box, text position is relative to it
+        if background_image is None:
+            # A text bitmap is created with solid background
+            text_image = Image.new('RGB', (right - left, bottom - top), background_color)
+        else:
+            # The text bitmap is created from provided background image : text with transparent background
+            text_image = self.crop_image(background_image, (left, top, right, bottom))
+
+        # Draw text onto the background image with specified color & font, from cached glyphs when possible
+        if glyph_atlas is None or not glyph_atlas.draw(text_image, (x - left, y - top), text, font_color, anchor):
+            d = ImageDraw.Draw(text_image)
+            d.text((x - left, y - top), text, font=ttfont, fill=font_color, align=align, anchor=anchor)
 
-        self.DisplayPILImage(text_image, left, top)
+        return text_image, left, top
 
     def DisplayProgressBar(self, x: int, y: int, width: int, height: int, min_value: int = 0, max_value: int = 100,
                            value: int = 50,
@@ -333,31 +592,67 @@ class LcdComm(ABC):
 
         assert min_value <= value <= max_value, 'Progress bar value shall be between min and max'
 
+        # Draw progress bar
+        bar_filled_width = (value / (max_value - min_value) * width) - 1
+        if bar_filled_width < 0:
+            bar_filled_width = 0
+        # Number of columns filled by the bar, as ImageDraw rounds the rectangle coordinates
+        filled_columns = min(int(bar_filled_width) + 1, width)
+
+        # The bar is made of the first columns of its full bitmap and the last columns of its empty bitmap: only the
+        # columns between the previous and the new end of the filled part have changed
+        place = (x, y, width, height, self.orientation)
+        config = (bar_color, bar_outline, background_color, background_image)
+        empty_image = self._get_progress_bar_image(x, y, width, height, config, False)
+        full_image = self._get_progress_bar_image(x, y, width, height, config, True)
+
+        with self.widgets_lock:
+            displayed = self.progress_bars.pop(place, None)
+
+        if displayed is not None and displayed[0] == config:
+            previous_filled_columns = displayed[1]
+            if filled_columns > previous_filled_columns:
+                self.UpdatePILImage(full_image.crop((previous_filled_columns, 0, filled_columns, height)),
+                                    x + previous_filled_columns, y)
+            elif filled_columns < previous_filled_columns:
+                self.UpdatePILImage(empty_image.crop((filled_columns, 0, previous_filled_columns, height)),
+                                    x + filled_columns, y)
+        else:
+            bar_image = empty_image.copy()
+            bar_image.paste(full_image.crop((0, 0, filled_columns, height)), (0, 0))
+            self.UpdatePILImage(bar_image, x, y)
+
+        with self.widgets_lock:
+            self.progress_bars[place] = (config, filled_columns)
+
+    def _get_progress_bar_image(self, x: int, y: int, width: int, height: int, config: Tuple, full: bool) -> Image.Image:
+        return self.image_cache.get_or_load(("progress_bar", x, y, width, height, full) + config,
+                                            lambda: self._draw_progress_bar(x, y, width, height, *config, full))
+
+    def _draw_progress_bar(self, x: int, y: int, width: int, height: int, bar_color: Tuple[int, int, int],
+                           bar_outline: bool, background_color: Tuple[int, int, int], background_image: Optional[str],
+                           full: bool) -> Image.Image:
+        # Get the bitmap of an empty or full progress bar
         if background_image is None:
             # A bitmap is created with solid background
             bar_image = Image.new('RGB', (width, height), background_color)
         else:
             # A bitmap is created from provided background image
-            bar_image = self.open_image(background_image)
-
             # Crop bitmap to keep only the progress bar background
-            bar_image = bar_image.crop(box=(x, y, x + width, y + height))
+            bar_image = self.crop_image(background_image, (x, y, x + width, y + height))
 
-        # Draw progress bar
-        bar_filled_width = (value / (max_value - min_value) * width) - 1
-        if bar_filled_width < 0:
-            bar_filled_width = 0
         draw = ImageDraw.Draw(bar_image)
-        draw.rectangle([0, 0, bar_filled_width, height - 1], fill=bar_color, outline=bar_color)
+        if full:
+            draw.rectangle([0, 0, width - 1, height - 1], fill=bar_color, outline=bar_color)
 
         if bar_outline:
             # Draw outline
             draw.rectangle([0, 0, width - 1, height - 1], fill=None, outline=bar_color)
 
-        self.DisplayPILImage(bar_image, x, y)
+        return bar_image
 
     def DisplayLineGraph(self, x: int, y: int, width: int, height: int,
-                         values: List[float],
+                         values: Union[List[float], np.ndarray, memoryview],
                          min_value: float = 0,
                          max_value: float = 100,
                          autoscale: bool = False,
@@ -381,56 +676,48 @@ class LcdComm(ABC):
         assert x + width <= self.get_width(), 'Progress bar width exceeds display width'
         assert y + height <= self.get_height(), 'Progress bar height exceeds display height'
 
-        if background_image is None:
-            # A bitmap is created with solid background
-            graph_image = Image.new('RGB', (width, height), background_color)
-        else:
-            # A bitmap is created from provided background image
-            graph_image = self.open_image(background_image)
-
-            # Crop bitmap to keep only the plot graph background
-            graph_image = graph_image.crop(box=(x, y, x + width, y + height))
+        # History of values can be a list, a NumPy array or a memoryview of floats. NaN values are not plotted
+        values = np.asarray(values, dtype=float)
 
         # if autoscale is enabled, define new min/max value to "zoom" the graph
-        if autoscale:
-            trueMin = max_value
-            trueMax = min_value
-            for value in values:
-                if not math.isnan(value):
-                    if trueMin > value:
-                        trueMin = value
-                    if trueMax < value:
-                        trueMax = value
+        if autoscale and not np.isnan(values).all():
+            trueMin = min(float(np.nanmin(values)), max_value)
+            trueMax = max(float(np.nanmax(values)), min_value)
 
             if trueMin != max_value and trueMax != min_value:
                 min_value = max(trueMin - 5, min_value)
                 max_value = min(trueMax + 5, max_value)
 
-        step = width / len(values)
-        # pre compute yScale multiplier value
-        yScale = height / (max_value - min_value)
-
-        plotsX = []
-        plotsY = []
-        count = 0
-        for value in values:
-            if not math.isnan(value):
-                # Don't let the set value exceed our min or max value, this is bad :)                
-                if value < min_value:
-                    value = min_value
-                elif max_value < value:
-                    value = max_value
-
-                assert min_value <= value <= max_value, 'Plot point value shall be between min and max'
-
-                plotsX.append(count * step)
-                plotsY.append(height - (value - min_value) * yScale)
+        # Don't let the set value exceed our min or max value, this is bad :)
+        values = np.clip(values, min_value, max_value)
+
+        # The plot of the previous values displayed at the same place is reused: only its changed area is drawn and sent
+        place = (x, y, width, height, self.orientation)
+        config = (line_color, line_width, graph_axis, axis_color, axis_font, axis_font_size, background_color,
+                  background_image)
+        with self.widgets_lock:
+            plot = self.line_graphs.pop(place, None)
+        if plot is None or plot.config != config:
+            plot = LineGraph(width, height, line_width, config)
+
+        dirty_box = plot.update(values, min_value, max_value)
+        if dirty_box is None:
+            # Plot has not changed: the graph displayed on the screen is already up-to-date
+            with self.widgets_lock:
+                self.line_graphs[place] = plot
+            return
 
-                count += 1
+        if background_image is None:
+            # A bitmap is created with solid background
+            graph_image = Image.new('RGB', (width, height), background_color)
+        else:
+            # A bitmap is created from provided background image
+            # Crop bitmap to keep only the plot graph background
+            graph_image = self.crop_image(background_image, (x, y, x + width, y + height))
 
         # Draw plot graph
+        graph_image.paste(line_color, (0, 0), plot.mask)
         draw = ImageDraw.Draw(graph_image)
-        draw.line(list(zip(plotsX, plotsY)), fill=line_color, width=line_width)
 
         if graph_axis:
             # Draw axis
@@ -450,7 +737,26 @@ class LcdComm(ABC):
             draw.text((width - 1 - right, height - 2 - bottom), text,
                       font=ttfont, fill=axis_color)
 
-        self.DisplayPILImage(graph_image, x, y)
+        # Axis and legend only change with the scale, in which case the whole plot is redrawn: only send the area of the
+        # plot that has changed
+        left, top, right, bottom = dirty_box
+        if (right - left, bottom - top) != graph_image.size:
+            graph_image = graph_image.crop(dirty_box)
+        self.UpdatePILImage(graph_image, x + left, y + top)
+
+        with self.widgets_lock:
+            self.line_graphs[place] = plot
+
+    def _forget_widgets(self, box: Tuple[int, int, int, int]):
+        # Widgets overwritten by a bitmap will be redrawn on next update, and line graphs and progress bars will be
+        # entirely redrawn
+        self.widget_states.overwritten(box)
+        with self.widgets_lock:
+            for widgets in [self.line_graphs, self.progress_bars]:
+                for place in list(widgets):
+                    x, y, width, height, _ = place
+                    if box[0] < x + width and x < box[2] and box[1] < y + height and y < box[3]:
+                        del widgets[place]
 
     def DrawRadialDecoration(self, draw: ImageDraw.ImageDraw, angle: float, radius: float, width: float, color: Tuple[int, int, int] = (0, 0, 0)):
         i_cos = math.cos(angle*math.pi/180)
@@ -528,18 +834,65 @@ class LcdComm(ABC):
 
         assert min_value <= value <= max_value, 'Radial value shall be between min and max'
 
-        diameter = 2 * radius
         bbox = (xc - radius, yc - radius, xc + radius, yc + radius)
+        pct = (value - min_value) / (max_value - min_value)
+        bar_args = (radius, bar_width, min_value, max_value, angle_start, angle_end, angle_sep, angle_steps, clockwise,
+                    bar_color, background_color, background_image, bbox, bar_background_color, draw_bar_background,
+                    bar_decoration)
+
+        if value == int(value):
+            # Bar bitmap only depends on the value: draw it once for each value, and keep it in the image cache
+            sheet = ("radial",) + bar_args
+            if self.radial_prerender and sheet not in self.radial_sprite_sheets:
+                # Draw the bitmaps of all the other values in the background
+                self.radial_sprite_sheets.add(sheet)
+                threading.Thread(target=self._prerender_radial_sprites, args=(sheet, bar_args), daemon=True).start()
+            bar_image = self._get_radial_sprite(sheet, bar_args, int(value)).copy()
+        else:
+            bar_image = self._draw_radial_bar(*bar_args, value)
+        draw = ImageDraw.Draw(bar_image)
+
+        # Draw text
+        if with_text:
+            if text is None:
+                text = f"{int(pct * 100 + .5)}%"
+            ttfont = self.open_font(font, font_size)
+            left, top, right, bottom = ttfont.getbbox(text)
+            w, h = right - left, bottom - top
+            draw.text((radius - w / 2 + text_offset[0], radius - top - h / 2 + text_offset[1]), text,
+                      font=ttfont, fill=font_color)
+
+        if custom_bbox[0] != 0 or custom_bbox[1] != 0 or custom_bbox[2] != 0 or custom_bbox[3] != 0:
+            bar_image = bar_image.crop(box=custom_bbox)
+
+        self.UpdatePILImage(bar_image, xc - radius + custom_bbox[0], yc - radius + custom_bbox[1])
+       # self.DisplayPILImage(bar_image, xc - radius, yc - radius)
+
+    def _get_radial_sprite(self, sheet: Tuple, bar_args: Tuple, value: int) -> Image.Image:
+        return self.image_cache.get_or_load(sheet + (value,), lambda: self._draw_radial_bar(*bar_args, value))
+
+    def _prerender_radial_sprites(self, sheet: Tuple, bar_args: Tuple):
+        min_value, max_value = bar_args[2], bar_args[3]
+        for value in range(math.ceil(min_value), math.floor(max_value) + 1):
+            self._get_radial_sprite(sheet, bar_args, value)
+        logger.debug(f"Radial progress bar sprites for values {min_value}-{max_value} have been drawn")
+
+    def _draw_radial_bar(self, radius: int, bar_width: int, min_value: int, max_value: int, angle_start: float,
+                         angle_end: float, angle_sep: int, angle_steps: int, clockwise: bool,
+                         bar_color: Tuple[int, int, int], background_color: Tuple[int, int, int],
+                         background_image: Optional[str], bbox: Tuple[int, int, int, int],
+                         bar_background_color: Tuple[int, int, int], draw_bar_background: bool, bar_decoration: str,
+                         value: float) -> Image.Image:
+        # Get the bitmap of a radial progress bar, without text
+        diameter = 2 * radius
         #
         if background_image is None:
             # A bitmap is created with solid background
             bar_image = Image.new('RGB', (diameter, diameter), background_color)
         else:
             # A bitmap is created from provided background image
-            bar_image = self.open_image(background_image)
-
             # Crop bitmap to keep only the progress bar background
-            bar_image = bar_image.crop(box=bbox)
+            bar_image = self.crop_image(background_image, bbox)
 
         # Draw progress bar
         pct = (value - min_value) / (max_value - min_value)
@@ -653,30 +1006,31 @@ class LcdComm(ABC):
                          fill=bar_color,
                          width=bar_width)
 
-        # Draw text
-        if with_text:
-            if text is None:
-                text = f"{int(pct * 100 + .5)}%"
-            ttfont = self.open_font(font, font_size)
-            left, top, right, bottom = ttfont.getbbox(text)
-            w, h = right - left, bottom - top
-            draw.text((radius - w / 2 + text_offset[0], radius - top - h / 2 + text_offset[1]), text,
-                      font=ttfont, fill=font_color)
-
-        if custom_bbox[0] != 0 or custom_bbox[1] != 0 or custom_bbox[2] != 0 or custom_bbox[3] != 0:
-            bar_image = bar_image.crop(box=custom_bbox)
-
-        self.DisplayPILImage(bar_image, xc - radius + custom_bbox[0], yc - radius + custom_bbox[1])
-       # self.DisplayPILImage(bar_image, xc - radius, yc - radius)
+        return bar_image
 
     # Load image from the filesystem, or get from the cache if it has already been loaded previously
     def open_image(self, bitmap_path: str) -> Image.Image:
-        if bitmap_path not in self.image_cache:
-            logger.debug("Bitmap " + bitmap_path + " is now loaded in the cache")
-            self.image_cache[bitmap_path] = Image.open(bitmap_path)
-        return copy.copy(self.image_cache[bitmap_path])
+        return self.image_cache.open(bitmap_path)
+
+    # Get an area of an image, without copying the whole image from the cache
+    def crop_image(self, bitmap_path: str, box: Tuple[int, int, int, int]) -> Image.Image:
+        return self.image_cache.crop(bitmap_path, box)
 
     def open_font(self, name: str, size: int) -> ImageFont.FreeTypeFont:
         if (name, size) not in self.font_cache:
             self.font_cache[(name, size)] = ImageFont.truetype(name, size)
         return self.font_cache[(name, size)]
+
+    def open_glyph_atlas(self, name: str, size: int) -> Optional[GlyphAtlas]:
+        # Glyph atlas of a font opened with open_font(), or None if the font uses the complex layout engine (Raqm, used
+        # by default if it is installed): its glyphs are kerned and shaped depending on the text, all texts are then
+        # drawn with ImageDraw.text()
+        if (name, size) not in self.glyph_atlases:
+            font = self.open_font(name, size)
+            if font.layout_engine == ImageFont.Layout.BASIC:
+                self.glyph_atlases[(name, size)] = GlyphAtlas(font)
+            else:
+                if not any(atlas is None for atlas in self.glyph_atlases.values()):
+                    logger.info("Texts are drawn with the complex layout engine (Raqm): glyph atlas is disabled")
+                self.glyph_atlases[(name, size)] = None
+        return self.glyph_atlases[(name, size)]
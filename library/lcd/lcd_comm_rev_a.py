@@ -23,7 +23,7 @@ from typing import Optional
 from serial.tools.list_ports import comports
 
 from library.lcd.lcd_comm import *
-from library.lcd.serialize import image_to_RGB565, chunked
+from library.lcd.serialize import fastest_image_to_RGB565
 from library.log import logger
 
 
@@ -57,6 +57,7 @@ class LcdCommRevA(LcdComm):
                  update_queue: Optional[queue.Queue] = None):
         logger.debug("HW revision: A")
         LcdComm.__init__(self, com_port, display_width, display_height, update_queue)
+        self.image_to_RGB565 = fastest_image_to_RGB565()  # Fastest bitmap serialization for this platform
         self.openSerial()
 
     def __del__(self):
@@ -129,11 +130,13 @@ class LcdCommRevA(LcdComm):
         # Wait for display reset then reconnect
         time.sleep(5)
         self.openSerial()
+        self.invalidate_screen()
 
     def Clear(self):
         self.SetOrientation(Orientation.PORTRAIT)  # Bug: orientation needs to be PORTRAIT before clearing
         self.SendCommand(Command.CLEAR, 0, 0, 0, 0)
         self.SetOrientation()  # Restore default orientation
+        self.invalidate_screen()
 
     def ScreenOff(self):
         self.SendCommand(Command.SCREEN_OFF, 0, 0, 0, 0)
@@ -206,12 +209,11 @@ class LcdCommRevA(LcdComm):
         (x0, y0) = (x, y)
         (x1, y1) = (x + image_width - 1, y + image_height - 1)
 
-        rgb565le = image_to_RGB565(image, "little")
+        rgb565le = self.image_to_RGB565(image, "little", self.get_serialize_buffer(image_width * image_height * 2))
 
         self.SendCommand(Command.DISPLAY_BITMAP, x0, y0, x1, y1)
 
         # Lock queue mutex then queue all the requests for the image data
         with self.update_queue_mutex:
-            # Send image data by multiple of "display width" bytes
-            for chunk in chunked(rgb565le, width * 8):
-                self.SendLine(chunk)
+            # Send image data in bulk
+            self.SendLines([rgb565le])
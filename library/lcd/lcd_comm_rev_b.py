@@ -20,7 +20,7 @@
 from serial.tools.list_ports import comports
 
 from library.lcd.lcd_comm import *
-from library.lcd.serialize import image_to_RGB565, chunked
+from library.lcd.serialize import fastest_image_to_RGB565
 from library.log import logger
 
 
@@ -53,6 +53,7 @@ class LcdCommRevB(LcdComm):
                  update_queue: Optional[queue.Queue] = None):
         logger.debug("HW revision: B")
         LcdComm.__init__(self, com_port, display_width, display_height, update_queue)
+        self.image_to_RGB565 = fastest_image_to_RGB565()  # Fastest bitmap serialization for this platform
         self.openSerial()
         self.sub_revision = SubRevision.A01  # Run a Hello command to detect correct sub-rev.
 
@@ -154,6 +155,7 @@ class LcdCommRevB(LcdComm):
 
         # Restore orientation
         self.SetOrientation(orientation=backup_orientation)
+        self.invalidate_screen()
 
     def ScreenOff(self):
         # HW revision B does not implement a "ScreenOff" native command: using SetBrightness(0) instead
@@ -193,12 +195,12 @@ class LcdCommRevB(LcdComm):
         else:
             self.SendCommand(Command.SET_ORIENTATION, payload=[OrientationValueRevB.ORIENTATION_LANDSCAPE])
 
-    def serialize_image(self, image: Image.Image, height: int, width: int) -> bytes:
+    def serialize_image(self, image: Image.Image, height: int, width: int) -> memoryview:
         if image.width != width or image.height != height:
             image = image.crop((0, 0, width, height))
         if self.orientation == Orientation.REVERSE_PORTRAIT or self.orientation == Orientation.REVERSE_LANDSCAPE:
             image = image.rotate(180)
-        return image_to_RGB565(image, "big")
+        return self.image_to_RGB565(image, "big", self.get_serialize_buffer(width * height * 2))
 
     def DisplayPILImage(
             self,
@@ -242,9 +244,8 @@ class LcdCommRevB(LcdComm):
 
         # Lock queue mutex then queue all the requests for the image data
         with self.update_queue_mutex:
-            # Send image data by multiple of "display width" bytes
-            for chunk in chunked(rgb565be, self.get_width() * 8):
-                self.SendLine(chunk)
+            # Send image data in bulk
+            self.SendLines([rgb565be])
 
             # Implement a cooldown between two bitmaps, because we are not listening to events coming from the display
             # Cooldown of 0.05 decreases "corrupted bitmap" significantly without slowing down too much
@@ -23,14 +23,15 @@ import string
 import time
 from enum import Enum
 from math import ceil
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
+import numpy as np
 import serial
 from PIL import Image
 from serial.tools.list_ports import comports
 
 from library.lcd.lcd_comm import Orientation, LcdComm
-from library.lcd.serialize import image_to_BGRA, image_to_BGR, chunked
+from library.lcd.serialize import join_chunks
 from library.log import logger
 
 
@@ -139,6 +140,12 @@ class LcdCommRevC(LcdComm):
         LcdComm.__init__(self, com_port, display_width, display_height, update_queue)
         self.openSerial()
 
+        # Bitmap updates are numbered (see Count): do not drop any of them
+        self.coalesce_updates = False
+
+        # Cache of full-screen bitmap layouts for each (orientation, sub-revision), see _get_full_image_layout()
+        self.full_image_layouts: Dict[Tuple[Orientation, SubRevision], Tuple[int, int]] = {}
+
     def __del__(self):
         self.closeSerial()
 
@@ -177,10 +184,11 @@ class LcdCommRevC(LcdComm):
 
     def _send_command(self, cmd: Command, payload: Optional[bytearray] = None, padding: Optional[Padding] = None,
                       bypass_queue: bool = False, readsize: Optional[int] = None):
-        message = bytearray()
+        # Command, payload and padding are sent as separate buffers, so that big payloads are not copied again
+        message = []
 
         if cmd != Command.SEND_PAYLOAD:
-            message = bytearray(cmd.value)
+            message.append(cmd.value)
 
         # logger.debug("Command: {}".format(cmd.name))
 
@@ -188,22 +196,22 @@ class LcdCommRevC(LcdComm):
             padding = Padding.NULL
 
         if payload:
-            message.extend(payload)
+            message.append(payload)
 
-        msg_size = len(message)
+        msg_size = sum(len(data) for data in message)
 
         if not (msg_size / 250).is_integer():
             pad_size = (250 * ceil(msg_size / 250) - msg_size)
-            message += bytearray(padding.value * pad_size)
+            message.append(padding.value * pad_size)
 
         # If no queue for async requests, or if asked explicitly to do the request sequentially: do request now
         if not self.update_queue or bypass_queue:
-            self.WriteData(message)
+            self.WriteLines(message)
             if readsize:
                 self.ReadData(readsize)
         else:
             # Lock queue mutex then queue the request
-            self.update_queue.put((self.WriteData, [message]))
+            self.update_queue.put((self.WriteLines, [message]))
             if readsize:
                 self.update_queue.put((self.ReadData, [readsize]))
 
@@ -253,6 +261,7 @@ class LcdCommRevC(LcdComm):
         # Wait for display reset then reconnect
         time.sleep(15)
         self.openSerial()
+        self.invalidate_screen()
 
     def Clear(self):
         # This hardware does not implement a Clear command: display a blank image on the whole screen
@@ -265,6 +274,7 @@ class LcdCommRevC(LcdComm):
 
         # Restore orientation
         self.SetOrientation(orientation=backup_orientation)
+        self.invalidate_screen()
 
     def ScreenOff(self):
         logger.info("Calling ScreenOff")
@@ -341,7 +351,7 @@ class LcdCommRevC(LcdComm):
                 self._send_command(display_bmp_cmd,
                                    payload=bytearray(int(self.display_width * self.display_width / 64).to_bytes(2, "big")))
                 self._send_command(Command.SEND_PAYLOAD,
-                                   payload=bytearray(self._generate_full_image(image)),
+                                   payload=self._generate_full_image(image),
                                    readsize=1024)
                 self._send_command(Command.QUERY_STATUS, readsize=1024)
         else:
@@ -352,70 +362,93 @@ class LcdCommRevC(LcdComm):
                 self._send_command(Command.QUERY_STATUS, readsize=1024)
             Count.Start += 1
 
-    def _generate_full_image(self, image: Image.Image) -> bytes:
-        if self.sub_revision == SubRevision.REV_8INCH:
-            if self.orientation == Orientation.LANDSCAPE:
-                image = image.rotate(270, expand=True)
-            elif self.orientation == Orientation.REVERSE_LANDSCAPE:
-                image = image.rotate(90, expand=True)
-            elif self.orientation == Orientation.PORTRAIT:
-                image = image.rotate(180, expand=True)
-            elif self.orientation == Orientation.REVERSE_PORTRAIT:
-                pass
-        else:
-            if self.orientation == Orientation.PORTRAIT:
-                image = image.rotate(90, expand=True)
-            elif self.orientation == Orientation.REVERSE_PORTRAIT:
-                image = image.rotate(270, expand=True)
-            elif self.orientation == Orientation.REVERSE_LANDSCAPE:
-                image = image.rotate(180)
+    def _get_full_image_layout(self) -> Tuple[int, int]:
+        # Get the rotation to apply to full-screen bitmaps (in 90° counterclockwise turns) and the size of their payload (BGRA pixels
+        # with a separator every 249 bytes, padded to a multiple of 250 bytes) for current orientation/sub-revision
+        key = (self.orientation, self.sub_revision)
+        if key not in self.full_image_layouts:
+            if self.sub_revision == SubRevision.REV_8INCH:
+                quarter_turns = {
+                    Orientation.LANDSCAPE: 3,
+                    Orientation.REVERSE_LANDSCAPE: 1,
+                    Orientation.PORTRAIT: 2,
+                    Orientation.REVERSE_PORTRAIT: 0,
+                }[self.orientation]
+            else:
+                quarter_turns = {
+                    Orientation.PORTRAIT: 1,
+                    Orientation.REVERSE_PORTRAIT: 3,
+                    Orientation.REVERSE_LANDSCAPE: 2,
+                    Orientation.LANDSCAPE: 0,
+                }[self.orientation]
+
+            data_size = self.display_width * self.display_height * 4
+            payload_size = 250 * ceil((data_size + (data_size - 1) // 249) / 250)
+            self.full_image_layouts[key] = (quarter_turns, payload_size)
+
+        return self.full_image_layouts[key]
 
-        bgra_data = image_to_BGRA(image)
+    def _generate_full_image(self, image: Image.Image) -> bytearray:
+        quarter_turns, payload_size = self._get_full_image_layout()
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
 
-        return b'\x00'.join(chunked(bgra_data, 249))
+        # Rotate image to the panel orientation and convert it to BGRA in a single copy
+        bgra_data = np.rot90(np.asarray(image), quarter_turns)[:, :, [2, 1, 0, 3]]
+
+        return join_chunks(bgra_data.reshape(-1), 249, size=payload_size)
 
     def _generate_update_image(
             self, image: Image.Image, x: int, y: int, count: int, cmd: Optional[Command] = None
     ) -> Tuple[bytearray, bytearray]:
+        if image.mode not in ["RGB", "RGBA"]:
+            image = image.convert("RGB")
+
+        # Rotate image to the panel orientation using views on its pixels, to avoid copies
+        rgb = np.asarray(image)
         x0, y0 = x, y
         if self.sub_revision == SubRevision.REV_8INCH:
             if self.orientation == Orientation.LANDSCAPE:
-                image = image.rotate(270, expand=True)
-                y0 = self.get_height() - y - image.width
+                rgb = np.rot90(rgb, 3)
+                y0 = self.get_height() - y - rgb.shape[1]
             elif self.orientation == Orientation.REVERSE_LANDSCAPE:
-                image = image.rotate(90, expand=True)
-                x0 = self.get_width() - x - image.height
+                rgb = np.rot90(rgb, 1)
+                x0 = self.get_width() - x - rgb.shape[0]
             elif self.orientation == Orientation.PORTRAIT:
-                image = image.rotate(180, expand=True)
-                x0 = self.get_height() - y - image.height
-                y0 = self.get_height() - x - image.width
+                rgb = np.rot90(rgb, 2)
+                x0 = self.get_height() - y - rgb.shape[0]
+                y0 = self.get_height() - x - rgb.shape[1]
             elif self.orientation == Orientation.REVERSE_PORTRAIT:
                 x0 = y
                 y0 = x
         else:
             if self.orientation == Orientation.PORTRAIT:
-                image = image.rotate(90, expand=True)
-                x0 = self.get_width() - x - image.height
+                rgb = np.rot90(rgb, 1)
+                x0 = self.get_width() - x - rgb.shape[0]
             elif self.orientation == Orientation.REVERSE_PORTRAIT:
-                image = image.rotate(270, expand=True)
-                y0 = self.get_height() - y - image.width
+                rgb = np.rot90(rgb, 3)
+                y0 = self.get_height() - y - rgb.shape[1]
             elif self.orientation == Orientation.REVERSE_LANDSCAPE:
-                image = image.rotate(180)
-                y0 = self.get_width() - x - image.width
-                x0 = self.get_height() - y - image.height
+                rgb = np.rot90(rgb, 2)
+                y0 = self.get_width() - x - rgb.shape[1]
+                x0 = self.get_height() - y - rgb.shape[0]
             elif self.orientation == Orientation.LANDSCAPE:
                 x0 = y
                 y0 = x
 
-        img_raw_data = bytearray()
-        bgr_data = image_to_BGR(image)
-        for h, line in enumerate(chunked(bgr_data, image.width * 3)):
-            if self.sub_revision == SubRevision.REV_8INCH:
-                img_raw_data += int(((x0 + h) * self.display_width) + y0).to_bytes(3, "big")
-            else:
-                img_raw_data += int(((x0 + h) * self.display_height) + y0).to_bytes(3, "big")
-            img_raw_data += int(image.width).to_bytes(2, "big")
-            img_raw_data += line
+        if self.sub_revision == SubRevision.REV_8INCH:
+            line_stride = self.display_width
+        else:
+            line_stride = self.display_height
+
+        # Each line is sent as: 3-byte address of its first pixel, 2-byte width, then BGR pixels
+        height, width = rgb.shape[0], rgb.shape[1]
+        lines = np.empty(height, dtype=[("address", np.uint8, 3), ("width", ">u2"), ("pixels", np.uint8, (width, 3))])
+        addresses = (x0 + np.arange(height, dtype=np.uint32)) * line_stride + y0
+        lines["address"] = addresses.astype(">u4").view(np.uint8).reshape((height, 4))[:, 1:]
+        lines["width"] = width
+        lines["pixels"] = rgb[:, :, 2::-1]  # RGB(A) to BGR
+        img_raw_data = lines.view(np.uint8)
 
         image_size = int(len(img_raw_data) + 2).to_bytes(3, "big")  # The +2 is for the "ef69" that will be added later.
 
@@ -429,7 +462,9 @@ class LcdCommRevC(LcdComm):
         payload.extend(count.to_bytes(4, 'big'))
 
         if len(img_raw_data) > 250:
-            img_raw_data = bytearray(b'\x00').join(chunked(bytes(img_raw_data), 249))
+            img_raw_data = join_chunks(img_raw_data, 249)
+        else:
+            img_raw_data = bytearray(img_raw_data)
         img_raw_data += b'\xef\x69'
 
         return img_raw_data, payload
@@ -21,7 +21,7 @@ from enum import Enum
 from serial.tools.list_ports import comports
 
 from library.lcd.lcd_comm import *
-from library.lcd.serialize import image_to_RGB565, chunked
+from library.lcd.serialize import fastest_image_to_RGB565, chunked
 from library.log import logger
 
 
@@ -44,6 +44,7 @@ class LcdCommRevD(LcdComm):
                  update_queue: Optional[queue.Queue] = None):
         logger.debug("HW revision: D")
         LcdComm.__init__(self, com_port, display_width, display_height, update_queue)
+        self.image_to_RGB565 = fastest_image_to_RGB565()  # Fastest bitmap serialization for this platform
         self.openSerial()
 
     def __del__(self):
@@ -91,6 +92,7 @@ class LcdCommRevD(LcdComm):
         color = 0xFFFF  # RGB565 White color
         color_bytes = bytearray(color.to_bytes(2, "big"))
         self.SendCommand(cmd=Command.DISPCOLOR, payload=color_bytes)
+        self.invalidate_screen()
 
     def ScreenOff(self):
         # HW revision D does not implement a "ScreenOff" native command: using SetBrightness(0) instead
@@ -156,12 +158,14 @@ class LcdCommRevD(LcdComm):
         if self.orientation == Orientation.PORTRAIT or self.orientation == Orientation.REVERSE_PORTRAIT:
             (x0, y0) = (x, y)
             (x1, y1) = (x + image_width - 1, y + image_height - 1)
+            quarter_turns = 0
         else:
             # Landscape / reverse landscape orientations are software managed: rotate image -90° and get new coordinates
-            image = image.rotate(270, expand=True)
+            # Image is rotated while being serialized
             (x0, y0) = (self.display_width - y - image_height, x)
             (x1, y1) = (self.display_width - y - 1, x + image_width - 1)
             image_width, image_height = image_height, image_width
+            quarter_turns = 3
 
         # Send bitmap size
         image_data = bytearray()
@@ -174,7 +178,8 @@ class LcdCommRevD(LcdComm):
         # Prepare bitmap data transmission
         self.SendCommand(Command.INTOPICMODE)
 
-        rgb565be = image_to_RGB565(image, "big")
+        rgb565be = self.image_to_RGB565(image, "big", self.get_serialize_buffer(image_width * image_height * 2),
+                                        quarter_turns)
 
         # Lock queue mutex then queue all the requests for the image data
         with self.update_queue_mutex:
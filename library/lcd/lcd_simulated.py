@@ -89,6 +89,7 @@ class LcdSimulated(LcdComm):
 
     def Clear(self):
         self.SetOrientation(self.orientation)
+        self.invalidate_screen()
 
     def ScreenOff(self):
         pass
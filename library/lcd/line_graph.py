@@ -0,0 +1,105 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Plot of a line graph, updated incrementally: when a new value is added to the history, only the new segment of the
+# line is drawn, and when the oldest value is removed the previous plot is shifted left instead of being redrawn.
+# The plot is a mask of the line pixels, identical to the line drawn by ImageDraw.line() for all the points at once
+
+from typing import Hashable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from library.lcd.box import Box
+
+
+class LineGraph:
+    def __init__(self, width: int, height: int, line_width: int, config: Hashable = None):
+        self.width = width
+        self.height = height
+        self.line_width = line_width
+
+        # Parameters the plot has been drawn with, other than the values: a new plot is needed if they change
+        self.config = config
+
+        self.mask = Image.new("L", (width, height))  # Line pixels: 255, other pixels: 0
+        self.draw = ImageDraw.Draw(self.mask)
+
+        # Plotted values (without NaN), with their scale
+        self.values = np.empty(0)
+        self.step = None
+        self.min_value = None
+        self.max_value = None
+
+    def update(self, values: np.ndarray, min_value: float, max_value: float) -> Optional[Box]:
+        # Plot the history of values: each value is a point, NaN values are skipped. Values are already limited to
+        # [min_value, max_value]. Return the area of the plot that has changed, or None if it has not changed
+        step = self.width / len(values)
+        values = values[~np.isnan(values)]
+        count = len(values)
+        previous_count = len(self.values)
+        same_scale = (step, min_value, max_value) == (self.step, self.min_value, self.max_value)
+
+        points = self._points(values, step, min_value, max_value)
+        self.step, self.min_value, self.max_value = step, min_value, max_value
+        previous_values, self.values = self.values, values
+
+        if same_scale and count == previous_count and np.array_equal(values, previous_values):
+            return None
+
+        if same_scale and step.is_integer() and count >= 2:
+            if count == previous_count + 1 and np.array_equal(values[:-1], previous_values):
+                # A value has been added: only draw the new segment
+                self.draw.line(points[-2:], fill=255, width=self.line_width)
+                return self._columns(points[-2][0], points[-1][0])
+
+            if count == previous_count and np.array_equal(values[:-1], previous_values[1:]):
+                # A value has been added and the oldest one removed: shift the plot left and draw the new segment
+                self._shift(int(step), points)
+                return 0, 0, self.width, self.height
+
+        # Draw the whole line again
+        self.draw.rectangle((0, 0, self.width, self.height), fill=0)
+        self.draw.line(points, fill=255, width=self.line_width)
+        return 0, 0, self.width, self.height
+
+    def _points(self, values: np.ndarray, step: float, min_value: float, max_value: float) -> List[Tuple[float, float]]:
+        y_scale = self.height / (max_value - min_value)
+        plots_x = np.arange(len(values)) * step
+        plots_y = self.height - (values - min_value) * y_scale
+        return list(zip(plots_x.tolist(), plots_y.tolist()))
+
+    def _shift(self, step: int, points: List[Tuple[float, float]]):
+        self.mask.paste(self.mask.crop((step, 0, self.width, self.height)), (0, 0))
+
+        # Pixels of the removed segment can remain near the left edge, and the columns on the right edge have not been
+        # shifted: clear these columns, then draw again all the segments that have pixels in them, and the new segment.
+        # The first segment is always drawn again, as its rasterization differs once its start is on the edge of the plot
+        left = step + self.line_width + 2
+        right = self.width - step
+        self.draw.rectangle((0, 0, left - 1, self.height), fill=0)
+        self.draw.rectangle((right, 0, self.width, self.height), fill=0)
+        for i in range(len(points) - 1):
+            start, end = points[i][0] - self.line_width - 1, points[i + 1][0] + self.line_width + 1
+            if start < left or end >= right or i == len(points) - 2:
+                self.draw.line(points[i:i + 2], fill=255, width=self.line_width)
+
+    def _columns(self, start: float, end: float) -> Box:
+        # Area of the plot covering all the pixels of a segment between these x coordinates
+        margin = self.line_width + 1
+        return max(int(start) - margin, 0), 0, min(int(end) + margin + 1, self.width), self.height
@@ -1,58 +1,136 @@
-from typing import Iterator, Literal
+import functools
+import sys
+import timeit
+from typing import Callable, Iterator, Literal, Optional, Union
 
 import numpy as np
 from PIL import Image
 
 
-def chunked(data: bytes, chunk_size: int) -> Iterator[bytes]:
+def chunked(data: Union[bytes, bytearray, memoryview], chunk_size: int) -> Iterator[bytes]:
+    # Slicing a memoryview does not copy the data
     for i in range(0, len(data), chunk_size):
         yield data[i : i + chunk_size]
 
 
-def image_to_RGB565(image: Image.Image, endianness: Literal["big", "little"]) -> bytes:
-    if image.mode not in ["RGB", "RGBA"]:
-        # we need the first 3 channels to be R, G and B
-        image = image.convert("RGB")
+def join_chunks(data: np.ndarray, chunk_size: int, separator: int = 0, size: int = 0) -> bytearray:
+    # Same as bytes([separator]).join(chunked(data, chunk_size)) for a 1-D array of bytes, without creating the chunks:
+    # data is copied in a single pass to a view of the output buffer with a separator column.
+    # If size is bigger than the joined data, output buffer is padded with null bytes up to this size
+    separators = max(len(data) - 1, 0) // chunk_size
+    out = bytearray(max(len(data) + separators, size))
+    out_array = np.frombuffer(out, dtype=np.uint8)
 
-    rgb = np.asarray(image)
+    # all chunks followed by a separator, then the last chunk
+    split = separators * chunk_size
+    with_separator = out_array[:separators * (chunk_size + 1)].reshape((separators, chunk_size + 1))
+    with_separator[:, :chunk_size] = data[:split].reshape((separators, chunk_size))
+    with_separator[:, chunk_size] = separator
+    out_array[separators * (chunk_size + 1):len(data) + separators] = data[split:]
 
-    # flatten the first 2 dimensions (width and height) into a single stream
-    # of RGB pixels
-    rgb = rgb.reshape((image.size[1] * image.size[0], -1))
+    return out
 
-    # extract R, G, B channels and promote them to 16 bits
-    r = rgb[:, 0].astype(np.uint16)
-    g = rgb[:, 1].astype(np.uint16)
-    b = rgb[:, 2].astype(np.uint16)
 
-    # construct RGB565
-    r = r >> 3
-    g = g >> 2
-    b = b >> 3
-    rgb565 = (r << 11) | (g << 5) | b
+# RGB565 bits of each 8-bit value for red, green and blue channels, for lookup-table based conversion
+_RGB565_LUT_R = (np.arange(256, dtype=np.uint16) & 0xF8) << 8
+_RGB565_LUT_G = (np.arange(256, dtype=np.uint16) & 0xFC) << 3
+_RGB565_LUT_B = np.arange(256, dtype=np.uint16) >> 3
+
+
+def image_to_RGB565(
+        image: Image.Image,
+        endianness: Literal["big", "little"],
+        out: Optional[bytearray] = None,
+        quarter_turns: int = 0
+) -> memoryview:
+    # Serialize image to RGB565 in out buffer if provided (must be at least 2 bytes per pixel), or in a new buffer.
+    # Returns a view of the serialized data in the buffer: buffer must not be reused while the view is needed.
+    # Image is rotated by quarter_turns * 90° counterclockwise while being serialized, like
+    # image.rotate(quarter_turns * 90, expand=True) but without any intermediate copy
+    return _serialize_RGB565(image, endianness, out, quarter_turns, _rgb_to_RGB565_shift)
+
+
+def image_to_RGB565_lut(
+        image: Image.Image,
+        endianness: Literal["big", "little"],
+        out: Optional[bytearray] = None,
+        quarter_turns: int = 0
+) -> memoryview:
+    # Same as image_to_RGB565, using lookup tables instead of bit shifts
+    return _serialize_RGB565(image, endianness, out, quarter_turns, _rgb_to_RGB565_lut)
+
+
+@functools.lru_cache(maxsize=None)
+def fastest_image_to_RGB565() -> Callable[..., memoryview]:
+    # Measure the RGB565 serialization functions on a sample frame, and return the fastest one on this platform.
+    # Results depend on the CPU and NumPy build, so it is only measured once at runtime
+    pixels = np.random.default_rng(0).integers(0, 256, (480, 320, 3), dtype=np.uint8)
+    image = Image.fromarray(pixels, "RGB")
+    out = bytearray(320 * 480 * 2)
+
+    durations = {}
+    for serializer in [image_to_RGB565, image_to_RGB565_lut]:
+        serializer(image, "big", out)  # warm-up
+        durations[serializer] = min(timeit.repeat(lambda: serializer(image, "big", out), number=1, repeat=5))
+
+    return min(durations, key=durations.get)
+
+
+def _serialize_RGB565(
+        image: Image.Image,
+        endianness: Literal["big", "little"],
+        out: Optional[bytearray],
+        quarter_turns: int,
+        rgb_to_RGB565: Callable[[np.ndarray, np.ndarray], None]
+) -> memoryview:
+    size = image.size[0] * image.size[1] * 2
+    if out is None:
+        out = bytearray(size)
+
+    # construct RGB565 directly in the output buffer, as native 16-bit integers
+    if quarter_turns % 2:
+        shape = (image.size[0], image.size[1])
+    else:
+        shape = (image.size[1], image.size[0])
+    rgb565 = np.frombuffer(out, dtype=np.uint16, count=size // 2).reshape(shape)
+
+    if image.mode in ["P", "L"]:
+        # no need to convert palette/grayscale images to RGB: only convert their (at most 256) colors
+        _palette_to_RGB565(image, quarter_turns, rgb565)
+    else:
+        if image.mode not in ["RGB", "RGBA"]:
+            # we need the first 3 channels to be R, G and B
+            image = image.convert("RGB")
+        rgb_to_RGB565(np.rot90(np.asarray(image), quarter_turns), rgb565)
 
     # serialize to the correct endianness
-    if endianness == "big":
-        typ = ">u2"
+    if endianness != sys.byteorder:
+        rgb565.byteswap(inplace=True)
+
+    return memoryview(out)[:size]
+
+
+def _rgb_to_RGB565_shift(rgb: np.ndarray, rgb565: np.ndarray):
+    np.left_shift(rgb[:, :, 0], 8, out=rgb565, dtype=np.uint16)
+    rgb565 &= 0xF800
+    g565 = np.left_shift(rgb[:, :, 1], 3, dtype=np.uint16)
+    g565 &= 0x07E0
+    rgb565 |= g565
+    rgb565 |= rgb[:, :, 2] >> 3
+
+
+def _rgb_to_RGB565_lut(rgb: np.ndarray, rgb565: np.ndarray):
+    np.take(_RGB565_LUT_R, rgb[:, :, 0], out=rgb565)
+    rgb565 |= _RGB565_LUT_G[rgb[:, :, 1]]
+    rgb565 |= _RGB565_LUT_B[rgb[:, :, 2]]
+
+
+def _palette_to_RGB565(image: Image.Image, quarter_turns: int, rgb565: np.ndarray):
+    if image.mode == "L":
+        colors = np.repeat(np.arange(256, dtype=np.uint8), 3).reshape((256, 3))
     else:
-        typ = "<u2"
-    return rgb565.astype(typ).tobytes()
-
-
-def image_to_BGR(image: Image.Image) -> bytes:
-    if image.mode not in ["RGB", "RGBA"]:
-        # we need the first 3 channels to be R, G and B
-        image = image.convert("RGB")
-    rgb = np.asarray(image)
-    # same as rgb[:, :, [2, 1, 0]] but faster
-    bgr = np.take(rgb, (2, 1, 0), axis=-1)
-    return bgr.tobytes()
-
-
-def image_to_BGRA(image: Image.Image) -> bytes:
-    if image.mode != "RGBA":
-        image = image.convert("RGBA")
-    rgba = np.asarray(image)
-    # same as rgba[:, :, [2, 1, 0, 3]] but faster
-    bgra = np.take(rgba, (2, 1, 0, 3), axis=-1)
-    return bgra.tobytes()
+        colors = np.zeros((256, 3), dtype=np.uint8)
+        palette = np.array(image.getpalette("RGB"), dtype=np.uint8).reshape((-1, 3))
+        colors[:len(palette)] = palette
+    palette565 = _RGB565_LUT_R[colors[:, 0]] | _RGB565_LUT_G[colors[:, 1]] | _RGB565_LUT_B[colors[:, 2]]
+    np.take(palette565, np.rot90(np.asarray(image), quarter_turns), out=rgb565)
@@ -0,0 +1,89 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Cache of rendered texts: values displayed by a system monitor often repeat (same percentage, same temperature...),
+# their bitmap is rendered once. Also remembers which text is displayed at each place of the screen, so that a text
+# identical to the one already displayed is not sent again
+
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+from PIL import Image
+
+from library.lcd.box import Box, intersects
+
+
+class TextCache:
+    def __init__(self, max_entries: int = 256):
+        # Maximum number of rendered texts in the cache: least recently used ones are removed above this number
+        self.max_entries = max_entries
+
+        # { key=text and all its rendering parameters, value=(rendered bitmap, x, y) }. Bitmaps must not be modified
+        self.images: OrderedDict[Hashable, Tuple[Image.Image, int, int]] = OrderedDict()
+
+        # { key=place of a text on the screen, value=(key of the text displayed there, area of its bitmap) }
+        self.displayed: Dict[Hashable, Tuple[Hashable, Box]] = {}
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # Texts not sent because they were already displayed
+
+        self.lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Tuple[Image.Image, int, int]]:
+        with self.lock:
+            entry = self.images.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.images.move_to_end(key)
+            return entry
+
+    def put(self, key: Hashable, image: Image.Image, x: int, y: int):
+        with self.lock:
+            self.images[key] = (image, x, y)
+            self.images.move_to_end(key)
+            while len(self.images) > self.max_entries:
+                self.images.popitem(last=False)
+
+    def is_displayed(self, place: Hashable, key: Hashable) -> bool:
+        with self.lock:
+            entry = self.displayed.get(place)
+            if entry is None or entry[0] != key:
+                return False
+            self.skipped += 1
+            return True
+
+    def set_displayed(self, place: Hashable, key: Hashable, box: Box):
+        with self.lock:
+            self.displayed[place] = (key, box)
+
+    def forget(self, box: Box):
+        # An area of the screen is redrawn: texts displayed there are not known to be on the screen anymore
+        with self.lock:
+            for place, (_, displayed_box) in list(self.displayed.items()):
+                if intersects(box, displayed_box):
+                    del self.displayed[place]
+
+    def invalidate(self):
+        # Screen content is not known anymore: all texts must be sent again
+        with self.lock:
+            self.displayed.clear()
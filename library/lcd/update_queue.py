@@ -0,0 +1,219 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Queue of requests to send to the display, limited by the amount of data waiting to be sent
+
+import collections
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from library.lcd.box import Box, intersects
+
+# A request to the display: (function, args), executed by the thread that processes the queue
+Request = Tuple[Callable, List[Any]]
+
+
+class _Batch:
+    def __init__(self, requests: List[Request], region: Optional[Box], callbacks: List[Callable]):
+        self.requests: Deque[Request] = collections.deque(requests)
+        # Area of the screen entirely redrawn by this batch, if any
+        self.region = region
+        # Functions to call once the batch has been sent or dropped
+        self.callbacks = callbacks
+        # Set when the first request of the batch has been taken from the queue: batch cannot be dropped anymore
+        self.started = False
+
+
+class UpdateQueue:
+    # Drop-in replacement for queue.Queue, with the same put/get/empty methods for (function, args) requests, but:
+    # - requests can be grouped in batches, e.g. all commands and data of a bitmap, that are always sent in sequence
+    # - the amount of data (bytes arguments) waiting in the queue is limited to max_bytes: when the display is slower
+    #   than the updates, threads queuing batches are blocked until enough data has been sent (backpressure).
+    #   Single requests (commands) are never blocked
+    # - pending bitmaps that are entirely redrawn by a new bitmap are replaced by it instead of being sent
+    def __init__(self, max_bytes: int = 1024 * 1024):
+        self.max_bytes = max_bytes
+
+        self.batches: Deque[_Batch] = collections.deque()
+        self.pending_bytes = 0
+        self.pending_requests = 0
+
+        # Number of bitmaps that have been dropped because they were outdated before being sent
+        self.dropped = 0
+
+        self.mutex = threading.Lock()
+        self.not_empty = threading.Condition(self.mutex)
+        self.not_full = threading.Condition(self.mutex)
+
+        # Batch being built by each thread
+        self.local = threading.local()
+
+    def put(self, item: Request):
+        batch = getattr(self.local, "batch", None)
+        if batch is not None:
+            # Sent with the other requests of the batch when it is complete
+            batch[0].append(item)
+        else:
+            self._put_batch([item], None, [], limit=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Request:
+        with self.not_empty:
+            if not block:
+                if not self.pending_requests:
+                    raise queue.Empty
+            elif timeout is None:
+                while not self.pending_requests:
+                    self.not_empty.wait()
+            else:
+                end_time = time.monotonic() + timeout
+                while not self.pending_requests:
+                    remaining = end_time - time.monotonic()
+                    if remaining <= 0.0:
+                        raise queue.Empty
+                    self.not_empty.wait(remaining)
+
+            while not self.batches[0].requests:
+                self.batches.popleft()
+            batch = self.batches[0]
+            batch.started = True
+            item = batch.requests.popleft()
+
+            self.pending_requests -= 1
+            self.pending_bytes -= _size(item)
+            self.not_full.notify_all()
+            return item
+
+    def empty(self) -> bool:
+        with self.mutex:
+            return not self.pending_requests
+
+    def qsize(self) -> int:
+        with self.mutex:
+            return self.pending_requests
+
+    @contextmanager
+    def batch(self, region: Optional[Box] = None, timeout: Optional[float] = None):
+        # Group all requests put by this thread in this context, and queue them together at the end. If region is set,
+        # the requests redraw entirely this area of the screen: they can be dropped if a newer batch redraws it too.
+        # If the queue is full, wait for up to timeout seconds (forever if None) then raise queue.Full
+        if getattr(self.local, "batch", None) is not None:
+            # Already in a batch: requests are part of it
+            yield
+            return
+
+        self.local.batch = ([], [])
+        try:
+            yield
+        finally:
+            requests, callbacks = self.local.batch
+            self.local.batch = None
+            if requests or callbacks:
+                self._put_batch(requests, region, callbacks, timeout=timeout)
+
+    def in_batch(self) -> bool:
+        return getattr(self.local, "batch", None) is not None
+
+    def add_done_callback(self, callback: Callable):
+        # Call a function once the current batch has been sent, or dropped
+        self.local.batch[1].append(callback)
+
+    def _put_batch(self, requests: List[Request], region: Optional[Box], callbacks: List[Callable],
+                   limit: bool = True, timeout: Optional[float] = None):
+        size = sum(_size(request) for request in requests)
+        dropped_batches = []
+        full = False
+
+        with self.not_full:
+            end_time = None if timeout is None else time.monotonic() + timeout
+            while True:
+                # Pending bitmaps redrawn entirely by the new one are outdated: replace them
+                position = len(self.batches)
+                if region is not None:
+                    replaced_batches, position = self._replace_batches(region)
+                    dropped_batches += replaced_batches
+
+                # Always accept a batch in an empty queue, even if it is bigger than the limit
+                if not limit or not self.pending_bytes or self.pending_bytes + size <= self.max_bytes:
+                    break
+
+                remaining = None if end_time is None else end_time - time.monotonic()
+                if remaining is not None and remaining <= 0.0:
+                    full = True
+                    break
+                self.not_full.wait(remaining)
+
+            if not full:
+                # Callbacks are called after the last request of the batch has been processed
+                requests = requests + [(callback, []) for callback in callbacks]
+                self.batches.insert(position, _Batch(requests, region, callbacks))
+                self.pending_requests += len(requests)
+                self.pending_bytes += size
+                self.not_empty.notify()
+
+        self._call_callbacks(dropped_batches)
+        if full:
+            for callback in callbacks:
+                callback()
+            raise queue.Full
+
+    @staticmethod
+    def _call_callbacks(batches: List[_Batch]):
+        # Must be called without holding the queue mutex
+        for batch in batches:
+            for callback in batch.callbacks:
+                callback()
+
+    def _replace_batches(self, region: Box) -> Tuple[List[_Batch], int]:
+        # Remove from the queue the batches not started yet that only redraw an area inside region, and get the position
+        # of the batch that replaces them: position of the first removed batch so that the new bitmap is not delayed,
+        # unless a batch after it draws in the same area (then the new bitmap must be sent after it, at the end)
+        kept, dropped = collections.deque(), []
+        position = None
+        for batch in self.batches:
+            if not batch.started and batch.region is not None and _contains(region, batch.region):
+                dropped.append(batch)
+                self.pending_requests -= len(batch.requests)
+                self.pending_bytes -= sum(_size(request) for request in batch.requests)
+                if position is None:
+                    position = len(kept)
+            else:
+                if batch.region is None or intersects(region, batch.region):
+                    # Batches without region are not known to be independent from the new bitmap
+                    position = None
+                kept.append(batch)
+        self.batches = kept
+        self.dropped += len(dropped)
+        return dropped, len(kept) if position is None else position
+
+
+def _size(request: Request) -> int:
+    # Amount of data sent by a request: bytes arguments, or lists of bytes
+    size = 0
+    for arg in request[1]:
+        if isinstance(arg, (bytes, bytearray, memoryview)):
+            size += len(arg)
+        elif isinstance(arg, list):
+            size += sum(len(item) for item in arg if isinstance(item, (bytes, bytearray, memoryview)))
+    return size
+
+
+def _contains(outer: Box, inner: Box) -> bool:
+    return outer[0] <= inner[0] and outer[1] <= inner[1] and outer[2] >= inner[2] and outer[3] >= inner[3]
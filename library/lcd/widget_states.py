@@ -0,0 +1,91 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Registry of the state of the widgets displayed on the screen (value and configuration they have been drawn with), to
+# skip redrawing a widget when nothing visible would change. Also remembers the area of the screen of each widget, so
+# that a widget overwritten by another bitmap is redrawn even if its state does not change
+
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Optional
+
+from library.lcd.box import Box, intersects
+
+
+class WidgetStates:
+    def __init__(self):
+        self.states: Dict[Hashable, Any] = {}  # { key=widget, value=state it is displayed with }
+        self.boxes: Dict[Hashable, Box] = {}  # { key=widget, value=area of the screen it has been drawn on }
+        self.drawing: Dict[int, Hashable] = {}  # { key=thread, value=widget being drawn by this thread }
+
+        # Statistics
+        self.drawn = 0
+        self.suppressed = 0  # Redraws skipped because the widget was already displayed with the same state
+
+        self.lock = threading.Lock()
+
+    def update(self, widget: Hashable, state: Any) -> bool:
+        # Remember the new state of a widget, and return True if it must be redrawn: False if it is already displayed
+        # with this state. Widgets whose area is not known yet are always redrawn
+        with self.lock:
+            if widget in self.states and self.states[widget] == state and widget in self.boxes:
+                self.suppressed += 1
+                return False
+            self.states[widget] = state
+            self.drawn += 1
+            return True
+
+    @contextmanager
+    def draw(self, widget: Hashable):
+        # Bitmaps displayed by this thread in this context are part of the widget
+        with self.lock:
+            self.drawing[threading.get_ident()] = widget
+        try:
+            yield
+        finally:
+            with self.lock:
+                del self.drawing[threading.get_ident()]
+
+    def overwritten(self, box: Box):
+        # A bitmap is displayed in this area: widgets displayed there will be redrawn on next update, except the widget
+        # being drawn by this thread, whose area is extended to this bitmap
+        with self.lock:
+            drawn_widget = self.drawing.get(threading.get_ident())
+            for widget, widget_box in list(self.boxes.items()):
+                if widget != drawn_widget and intersects(box, widget_box):
+                    del self.boxes[widget]
+                    self.states.pop(widget, None)
+            if drawn_widget is not None:
+                self.boxes[drawn_widget] = _union(self.boxes.get(drawn_widget), box)
+
+    def forget(self, widget: Hashable):
+        # Widget will be redrawn on next update, e.g. if its drawing failed
+        with self.lock:
+            self.states.pop(widget, None)
+
+    def invalidate(self):
+        # Screen content is not known anymore: all widgets must be redrawn
+        with self.lock:
+            self.states.clear()
+            self.boxes.clear()
+
+
+def _union(a: Optional[Box], b: Box) -> Box:
+    if a is None:
+        return b
+    return min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])
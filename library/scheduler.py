@@ -26,9 +26,16 @@ from functools import wraps
 
 import library.config as config
 import library.stats as stats
+from library.display import display
+from library.job_scheduler import Scheduler
 
 STOPPING = False
 
+SCHEDULER = Scheduler(workers=config.CONFIG_DATA['config'].get("SCHEDULER_WORKERS", 4),
+                      adaptive_max_interval=config.CONFIG_DATA['config'].get("ADAPTIVE_MAX_INTERVAL", 0),
+                      adaptive_threshold=config.CONFIG_DATA['config'].get("ADAPTIVE_THRESHOLD", 5),
+                      stopping=lambda: STOPPING)
+
 
 def async_job(threadname=None):
     """ wrapper to handle asynchronous threads """
@@ -70,7 +77,7 @@ def schedule(interval):
             """ Wrapper to create our schedule and run it at the appropriate time """
             if interval == 0:
                 return
-            scheduler = sched.scheduler(time.time, time.sleep)
+            scheduler = sched.scheduler(time.monotonic, time.sleep)
             periodic(scheduler, interval, func)
             scheduler.run()
 
@@ -79,110 +86,144 @@ def schedule(interval):
     return decorator
 
 
-@async_job("CPU_Percentage")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['PERCENTAGE'].get("INTERVAL", 0)).total_seconds())
+def periodic_job(interval, phase=None, histories=()):
+    """ wrapper to run a job periodically from the central scheduler """
+
+    def decorator(func):
+        """ Decorator to extend periodic_job """
+
+        @wraps(func)
+        def wrap():
+            """ Wrapper to add our job to the scheduler """
+            if interval == 0:
+                return
+            SCHEDULER.add(func, interval, phase, histories)
+
+        return wrap
+
+    return decorator
+
+
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['PERCENTAGE'].get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS']['CPU']['PERCENTAGE'].get("PHASE"),
+              histories=[stats.CPU.last_values_cpu_percentage])
 def CPUPercentage():
     """ Refresh the CPU Percentage """
     # logger.debug("Refresh CPU Percentage")
     stats.CPU.percentage()
 
 
-@async_job("CPU_Frequency")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['FREQUENCY'].get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['FREQUENCY'].get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS']['CPU']['FREQUENCY'].get("PHASE"),
+              histories=[stats.CPU.last_values_cpu_frequency])
 def CPUFrequency():
     """ Refresh the CPU Frequency """
     # logger.debug("Refresh CPU Frequency")
     stats.CPU.frequency()
 
 
-@async_job("CPU_Load")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['LOAD'].get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['LOAD'].get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS']['CPU']['LOAD'].get("PHASE"))
 def CPULoad():
     """ Refresh the CPU Load """
     # logger.debug("Refresh CPU Load")
     stats.CPU.load()
 
 
-@async_job("CPU_Load")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['TEMPERATURE'].get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['TEMPERATURE'].get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS']['CPU']['TEMPERATURE'].get("PHASE"),
+              histories=[stats.CPU.last_values_cpu_temperature])
 def CPUTemperature():
     """ Refresh the CPU Temperature """
     # logger.debug("Refresh CPU Temperature")
     stats.CPU.temperature()
 
 
-@async_job("CPU_FanSpeed")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['FAN_SPEED'].get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS']['CPU']['FAN_SPEED'].get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS']['CPU']['FAN_SPEED'].get("PHASE"),
+              histories=[stats.CPU.last_values_cpu_fan_speed])
 def CPUFanSpeed():
     """ Refresh the CPU Fan Speed """
     # logger.debug("Refresh CPU Fan Speed")
     stats.CPU.fan_speed()
 
 
-@async_job("GPU_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('GPU', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('GPU', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('GPU', {}).get("PHASE"),
+              histories=[stats.Gpu.last_values_gpu_percentage, stats.Gpu.last_values_gpu_mem_percentage,
+                         stats.Gpu.last_values_gpu_temperature, stats.Gpu.last_values_gpu_fps,
+                         stats.Gpu.last_values_gpu_fan_speed, stats.Gpu.last_values_gpu_frequency])
 def GpuStats():
     """ Refresh the GPU Stats """
     # logger.debug("Refresh GPU Stats")
     stats.Gpu.stats()
 
 
-@async_job("Memory_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('MEMORY', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('MEMORY', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('MEMORY', {}).get("PHASE"),
+              histories=[stats.Memory.last_values_memory_swap, stats.Memory.last_values_memory_virtual])
 def MemoryStats():
     # logger.debug("Refresh memory stats")
     stats.Memory.stats()
 
 
-@async_job("Disk_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('DISK', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('DISK', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('DISK', {}).get("PHASE"),
+              histories=[stats.Disk.last_values_disk_usage])
 def DiskStats():
     # logger.debug("Refresh disk stats")
     stats.Disk.stats()
 
 
-@async_job("Net_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('NET', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('NET', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('NET', {}).get("PHASE"))
 def NetStats():
     # logger.debug("Refresh net stats")
     stats.Net.stats()
 
 
-@async_job("Date_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('DATE', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('DATE', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('DATE', {}).get("PHASE"))
 def DateStats():
     # logger.debug("Refresh date stats")
     stats.Date.stats()
 
 
-@async_job("SystemUptime_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('UPTIME', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('UPTIME', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('UPTIME', {}).get("PHASE"))
 def SystemUptimeStats():
     # logger.debug("Refresh system uptime stats")
     stats.SystemUptime.stats()
 
 
-@async_job("Custom_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('CUSTOM', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('CUSTOM', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('CUSTOM', {}).get("PHASE"))
 def CustomStats():
     # print("Refresh custom stats")
     stats.Custom.stats()
 
 
-@async_job("Weather_Stats")
-@schedule(timedelta(seconds=max(300.0, config.THEME_DATA['STATS'].get('WEATHER', {}).get("INTERVAL", 0))).total_seconds())
+@periodic_job(timedelta(seconds=max(300.0, config.THEME_DATA['STATS'].get('WEATHER', {}).get("INTERVAL", 0))).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('WEATHER', {}).get("PHASE"))
 def WeatherStats():
     # logger.debug("Refresh Weather data")
     stats.Weather.stats()
 
 
-@async_job("Ping_Stats")
-@schedule(timedelta(seconds=config.THEME_DATA['STATS'].get('PING', {}).get("INTERVAL", 0)).total_seconds())
+@periodic_job(timedelta(seconds=config.THEME_DATA['STATS'].get('PING', {}).get("INTERVAL", 0)).total_seconds(),
+              phase=config.THEME_DATA['STATS'].get('PING', {}).get("PHASE"),
+              histories=[stats.Ping.last_values_ping])
 def PingStats():
     # logger.debug("Refresh Ping data")
     stats.Ping.stats()
 
 
+@periodic_job(timedelta(seconds=config.CONFIG_DATA["display"].get("FRAME_INTERVAL", 0.5)).total_seconds())
+def DisplayFlush():
+    # Send to the display the areas drawn on the compositor canvas since previous frame
+    display.lcd.FlushCompositor()
+
+
 @async_job("Queue_Handler")
 @schedule(timedelta(milliseconds=1).total_seconds())
 def QueueHandler():
@@ -6,6 +6,7 @@ from PIL import Image
 import requests
 from io import BytesIO
 from library.log import logger
+from library.sensors.slow_providers import slow_providers
 from datetime import datetime
 
 plex_last_reported_position = None
@@ -14,6 +15,7 @@ plex_last_position_datetime = None
 class PlexMediaController(MediaController):
     def __init__(self, base_url: str, token: str, product: str, profile: str, device: str = None):
         self._plex = PlexServer(base_url, token)
+        self.base_url = base_url
         self._current_info = MediaInfo()
         self.product = product
         self.profile = profile
@@ -160,4 +162,8 @@ class PlexMediaController(MediaController):
 
     def get_media_info(self) -> MediaInfo:
         """Obtiene la información actual del medio en reproducción"""
-        return self._update_media_info()
\ No newline at end of file
+        # El servidor Plex puede tardar en responder: la información se actualiza en segundo plano.
+        # Los controladores se crean de nuevo en cada actualización: la clave no depende de la instancia, para
+        # reutilizar el último resultado y no lanzar otra petición mientras una sigue en curso
+        key = ("plex", self.base_url, self.product, self.profile, self.device)
+        return slow_providers.read(key, self._update_media_info, default=MediaInfo())
\ No newline at end of file
@@ -0,0 +1,64 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Snapshot of the hardware readings shared by the stats refreshed at the same time: several stats often need the same
+# reading (e.g. update of the whole CPU device by LibreHardwareMonitor for CPU load, frequency and temperature, or
+# psutil.virtual_memory() for used/free memory). A reading is done once, and its result is reused by all the stats
+# that need it for a short time
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+# Time during which a reading is reused, in seconds. Must be shorter than the refresh interval of the stats
+DEFAULT_TTL = 0.25
+
+
+class SensorSnapshot:
+    def __init__(self, ttl: float = DEFAULT_TTL):
+        self.ttl = ttl
+
+        self.readings: Dict[Hashable, Tuple[float, Any]] = {}  # { key=reading, value=(time of the reading, result) }
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+
+        # One lock per reading, so that stats refreshed at the same time by different threads wait for the reading
+        # in progress instead of doing it again
+        self.locks: Dict[Hashable, threading.Lock] = {}
+        self.lock = threading.Lock()
+
+    def read(self, key: Hashable, read: Callable[[], Any]) -> Any:
+        # Get the result of a reading, from the snapshot if it has been done recently
+        with self.lock:
+            reading_lock = self.locks.setdefault(key, threading.Lock())
+
+        with reading_lock:
+            reading = self.readings.get(key)
+            if reading is not None and time.monotonic() - reading[0] < self.ttl:
+                self.hits += 1
+                return reading[1]
+
+            self.misses += 1
+            result = read()
+            self.readings[key] = (time.monotonic(), result)
+            return result
+
+
+snapshot = SensorSnapshot()
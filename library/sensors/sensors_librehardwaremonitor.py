@@ -33,6 +33,7 @@ from win32api import *
 
 import library.sensors.sensors as sensors
 from library.log import logger
+from library.sensors.sensor_snapshot import snapshot
 
 # Import LibreHardwareMonitor dll to Python
 lhm_dll = os.getcwd() + '\\external\\LibreHardwareMonitor\\LibreHardwareMonitorLib.dll'
@@ -88,11 +89,16 @@ for hardware in handle.Hardware:
         logger.info("Found Network interface: %s" % hardware.Name)
 
 
+def update_hardware(hardware: Hardware.Hardware):
+    # Read all the sensors of a device, unless they have just been read for another stat
+    snapshot.read(str(hardware.Identifier), hardware.Update)
+
+
 def get_hw_and_update(hwtype: Hardware.HardwareType, name: str = None) -> Hardware.Hardware:
     for hardware in handle.Hardware:
         if hardware.HardwareType == hwtype:
             if (name and hardware.Name == name) or name is None:
-                hardware.Update()
+                update_hardware(hardware)
                 return hardware
     return None
 
@@ -164,7 +170,7 @@ def get_gpu_name() -> str:
 def get_net_interface_and_update(if_name: str) -> Hardware.Hardware:
     for hardware in handle.Hardware:
         if hardware.HardwareType == Hardware.HardwareType.Network and hardware.Name == if_name:
-            hardware.Update()
+            update_hardware(hardware)
             return hardware
 
     logger.warning("Network interface '%s' not found. Check names in config.yaml." % if_name)
@@ -243,7 +249,7 @@ class Cpu(sensors.Cpu):
         mb = get_hw_and_update(Hardware.HardwareType.Motherboard)
         try:
             for sh in mb.SubHardware:
-                sh.Update()
+                update_hardware(sh)
                 for sensor in sh.Sensors:
                     if sensor.SensorType == Hardware.SensorType.Control and "#2" in str(
                             sensor.Name) and sensor.Value is not None:  # Is Motherboard #2 Fan always the CPU Fan ?
@@ -449,15 +455,15 @@ class Memory(sensors.Memory):
 class Disk(sensors.Disk):
     @staticmethod
     def disk_usage_percent() -> float:
-        return psutil.disk_usage("/").percent
+        return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).percent
 
     @staticmethod
     def disk_used() -> int:  # In bytes
-        return psutil.disk_usage("/").used
+        return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).used
 
     @staticmethod
     def disk_free() -> int:  # In bytes
-        return psutil.disk_usage("/").free
+        return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).free
 
 
 class Net(sensors.Net):
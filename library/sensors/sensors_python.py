@@ -33,6 +33,8 @@ import psutil
 
 import library.sensors.sensors as sensors
 from library.log import logger
+from library.sensors.sensor_snapshot import snapshot
+from library.sensors.slow_providers import slow_providers
 
 # AMD GPU on Linux
 try:
@@ -155,7 +157,7 @@ class Cpu(sensors.Cpu):
     @staticmethod
     def fan_percent(fan_name: str = None) -> float:
         try:
-            fans = sensors_fans()
+            fans = snapshot.read("sensors_fans", sensors_fans)
             if fans:
                 for name, entries in fans.items():
                     for entry in entries:
@@ -235,7 +237,8 @@ class GpuNvidia(sensors.Gpu):
     def stats() -> Tuple[
         float, float, float, float, float]:  # load (%) / used mem (%) / used mem (Mb) / total mem (Mb) / temp (°C)
         # Unlike other sensors, Nvidia GPU with GPUtil pulls in all the stats at once
-        nvidia_gpus = GPUtil.getGPUs()
+        # GPUtil runs nvidia-smi, which can be slow: it is read in the background
+        nvidia_gpus = slow_providers.read("nvidia_gpus", GPUtil.getGPUs, default=[])
 
         try:
             memory_used_all = [item.memoryUsed for item in nvidia_gpus]
@@ -276,7 +279,7 @@ class GpuNvidia(sensors.Gpu):
     @staticmethod
     def fan_percent() -> float:
         try:
-            fans = sensors_fans()
+            fans = snapshot.read("sensors_fans", sensors_fans)
             if fans:
                 for name, entries in fans.items():
                     for entry in entries:
@@ -364,7 +367,7 @@ class GpuAmd(sensors.Gpu):
     def fan_percent() -> float:
         try:
             # Try with psutil fans
-            fans = sensors_fans()
+            fans = snapshot.read("sensors_fans", sensors_fans)
             if fans:
                 for name, entries in fans.items():
                     for entry in entries:
@@ -417,7 +420,7 @@ class Memory(sensors.Memory):
     @staticmethod
     def virtual_percent() -> float:
         try:
-            return psutil.virtual_memory().percent
+            return snapshot.read("virtual_memory", psutil.virtual_memory).percent
         except:
             return math.nan
 
@@ -426,7 +429,8 @@ class Memory(sensors.Memory):
         try:
             # Do not use psutil.virtual_memory().used: from https://psutil.readthedocs.io/en/latest/#memory
             # "It is calculated differently depending on the platform and designed for informational purposes only"
-            return psutil.virtual_memory().total - psutil.virtual_memory().available
+            virtual_memory = snapshot.read("virtual_memory", psutil.virtual_memory)
+            return virtual_memory.total - virtual_memory.available
         except:
             return -1
 
@@ -435,7 +439,7 @@ class Memory(sensors.Memory):
         try:
             # Do not use psutil.virtual_memory().free: from https://psutil.readthedocs.io/en/latest/#memory
             # "note that this doesn’t reflect the actual memory available (use available instead)."
-            return psutil.virtual_memory().available
+            return snapshot.read("virtual_memory", psutil.virtual_memory).available
         except:
             return -1
 
@@ -444,21 +448,21 @@ class Disk(sensors.Disk):
     @staticmethod
     def disk_usage_percent() -> float:
         try:
-            return psutil.disk_usage("/").percent
+            return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).percent
         except:
             return math.nan
 
     @staticmethod
     def disk_used() -> int:  # In bytes
         try:
-            return psutil.disk_usage("/").used
+            return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).used
         except:
             return -1
 
     @staticmethod
     def disk_free() -> int:  # In bytes
         try:
-            return psutil.disk_usage("/").free
+            return snapshot.read("disk_usage", lambda: psutil.disk_usage("/")).free
         except:
             return -1
 
@@ -0,0 +1,88 @@
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# Slow or blocking sensor providers (ping, weather API, Plex server, nvidia-smi...) are read by a separate pool of
+# threads, with a timeout: a refresh waits for a new reading at most for this timeout, then uses the last completed
+# reading while the new one goes on in the background. A provider that hangs never stalls the refresh of its stats, and
+# no other reading of this provider is started until it returns
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable, Dict, Hashable
+
+from library.log import logger
+
+# Time a refresh waits for a new reading, in seconds
+DEFAULT_TIMEOUT = 1.0
+
+
+class SlowProviders:
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT, workers: int = 4):
+        self.timeout = timeout
+        self.workers = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="Slow_Provider")
+
+        self.readings: Dict[Hashable, Future] = {}  # { key=provider, value=reading in progress or last started }
+        self.results: Dict[Hashable, Any] = {}  # { key=provider, value=result of the last completed reading }
+
+        # Statistics
+        self.timeouts = 0
+
+        self.lock = threading.Lock()
+
+    def read(self, key: Hashable, read: Callable[[], Any], default: Any = None,
+             on_late_result: Callable[[Any], None] = None) -> Any:
+        # Get the result of a new reading if it completes within the timeout. Otherwise, get the result of the last
+        # completed reading (default if there is none), or if on_late_result is given, get default and have the result
+        # passed to on_late_result when the reading completes. Exceptions raised by the reading are raised again
+        with self.lock:
+            future = self.readings.get(key)
+            started = future is None or future.done()
+            if started:
+                future = self.workers.submit(self._read, key, read)
+                self.readings[key] = future
+
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            logger.debug(f"Reading of {key} is too slow, continuing in the background")
+            with self.lock:
+                self.timeouts += 1
+                if on_late_result is None:
+                    return self.results.get(key, default)
+
+            # Only the call that started the reading waits for its result, so that it is passed once
+            if started:
+                future.add_done_callback(lambda done: self._pass_late_result(key, done, on_late_result))
+            return default
+
+    def _read(self, key: Hashable, read: Callable[[], Any]) -> Any:
+        # Result is stored before the reading is marked as completed
+        result = read()
+        with self.lock:
+            self.results[key] = result
+        return result
+
+    @staticmethod
+    def _pass_late_result(key: Hashable, future: Future, on_late_result: Callable[[Any], None]):
+        try:
+            on_late_result(future.result())
+        except Exception as e:
+            logger.error(f"Error with late reading of {key}: {str(e)}")
+
+
+slow_providers = SlowProviders()
@@ -21,6 +21,7 @@
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
 import datetime
+import functools
 import locale
 import math
 import os
@@ -47,6 +48,7 @@ WLO_CARD = config.CONFIG_DATA["config"].get("WLO", "")
 HW_SENSORS = config.CONFIG_DATA["config"].get("HW_SENSORS", "AUTO")
 CPU_FAN = config.CONFIG_DATA["config"].get("CPU_FAN", "AUTO")
 PING_DEST = config.CONFIG_DATA["config"].get("PING", "127.0.0.1")
+WEATHER_TIMEOUT = 10  # seconds, so that a hung request does not block the weather readings forever
 
 if HW_SENSORS == "PYTHON":
     if platform.system() == 'Windows':
@@ -81,6 +83,9 @@ else:
         os._exit(0)
 
 import library.sensors.sensors_custom as sensors_custom
+from library.sensors.slow_providers import slow_providers
+
+slow_providers.timeout = config.CONFIG_DATA["config"].get("SLOW_PROVIDERS_TIMEOUT", 1.0)
 
 
 def get_theme_file_path(name):
@@ -90,6 +95,22 @@ def get_theme_file_path(name):
         return None
 
 
+def _draw_themed_widget(theme_data, draw, **kwargs):
+    # Draw a themed widget, unless it is already displayed with the same value and configuration. Widgets are
+    # identified by their type and position
+    widget = (draw.__name__, theme_data.get("X", 0), theme_data.get("Y", 0))
+    if not display.lcd.widget_states.update(widget, kwargs):
+        return
+
+    try:
+        with display.lcd.widget_states.draw(widget):
+            draw(**kwargs)
+    except:
+        # Widget has not been drawn: draw it again next time
+        display.lcd.widget_states.forget(widget)
+        raise
+
+
 def display_themed_value(theme_data, value, min_size=0, unit=''):
     if not theme_data.get("SHOW", False):
         return
@@ -104,7 +125,8 @@ def display_themed_value(theme_data, value, min_size=0, unit=''):
     if theme_data.get("SHOW_UNIT", True) and unit:
         text += str(unit)
 
-    display.lcd.DisplayText(
+    _draw_themed_widget(
+        theme_data, display.lcd.DisplayText,
         text=text,
         x=theme_data.get("X", 0),
         y=theme_data.get("Y", 0),
@@ -142,7 +164,8 @@ def display_themed_progress_bar(theme_data, value):
     if not theme_data.get("SHOW", False):
         return
 
-    display.lcd.DisplayProgressBar(
+    _draw_themed_widget(
+        theme_data, display.lcd.DisplayProgressBar,
         x=theme_data.get("X", 0),
         y=theme_data.get("Y", 0),
         width=theme_data.get("WIDTH", 0),
@@ -171,7 +194,8 @@ def display_themed_radial_bar(theme_data, value, min_size=0, unit='', custom_tex
     else:
         text = ""
 
-    display.lcd.DisplayRadialProgressBar(
+    _draw_themed_widget(
+        theme_data, display.lcd.DisplayRadialProgressBar,
         xc=theme_data.get("X", 0),
         yc=theme_data.get("Y", 0),
         radius=theme_data.get("RADIUS", 1),
@@ -223,12 +247,13 @@ def display_themed_line_graph(theme_data, values):
 
     line_color = theme_data.get("LINE_COLOR", (0, 0, 0))
 
-    display.lcd.DisplayLineGraph(
+    _draw_themed_widget(
+        theme_data, display.lcd.DisplayLineGraph,
         x=theme_data.get("X", 0),
         y=theme_data.get("Y", 0),
         width=theme_data.get("WIDTH", 1),
         height=theme_data.get("HEIGHT", 1),
-        values=values,
+        values=list(values),  # Copy of the history at this time, it is updated in place
         min_value=theme_data.get("MIN_VALUE", 0),
         max_value=theme_data.get("MAX_VALUE", 100),
         autoscale=theme_data.get("AUTOSCALE", False),
@@ -256,7 +281,7 @@ def display_themed_dynamic_image(theme_data, value):
     else:
         value = value.resize((width, height), Image.Resampling.LANCZOS)
 
-    display.lcd.DisplayPILImage(
+    display.lcd.UpdatePILImage(
         image=value,
         x=theme_data.get("X", 0),
         y=theme_data.get("Y", 0),
@@ -275,19 +300,25 @@ def display_themed_star_rating(theme_data, value, max_value=10, stars=5):
     if not theme_data.get("SHOW", False):
         return
 
+    # El rating solo se dibuja de nuevo si su valor cambia
+    _draw_themed_widget(
+        theme_data, _draw_star_rating,
+        rating_data=theme_data, value=value, max_value=max_value, stars=stars)
+
+
+def _draw_star_rating(rating_data, value, max_value, stars):
     # Crear una imagen nueva con fondo transparente
-    left = theme_data.get("X", 0)
-    upper = theme_data.get("Y", 0)
-    width = theme_data.get("WIDTH", 100)
-    height = theme_data.get("HEIGHT", 20)
-    background_image=get_theme_file_path(theme_data.get("BACKGROUND_IMAGE", None))
-    background_color = theme_data.get("BACKGROUND_COLOR", (0, 0, 0, 0))
+    left = rating_data.get("X", 0)
+    upper = rating_data.get("Y", 0)
+    width = rating_data.get("WIDTH", 100)
+    height = rating_data.get("HEIGHT", 20)
+    background_image=get_theme_file_path(rating_data.get("BACKGROUND_IMAGE", None))
+    background_color = rating_data.get("BACKGROUND_COLOR", (0, 0, 0, 0))
 
     if background_image:
         # Usar imagen de fondo existente
-        image = display.lcd.open_image(background_image)
         # Recortar al tamaño necesario
-        image = image.crop((left, upper, left + width, upper + height))
+        image = display.lcd.crop_image(background_image, (left, upper, left + width, upper + height))
     else:
         # Crear nueva imagen con color de fondo
         image = Image.new('RGBA', (width, height), background_color)
@@ -304,9 +335,14 @@ def display_themed_star_rating(theme_data, value, max_value=10, stars=5):
     filled_stars = value / value_per_star
 
     # Color de las estrellas (con alpha para transparencia)
-    filled_color = parse_color(theme_data.get("FILLED_COLOR", (255, 215, 0)))
-    outline_color = parse_color(theme_data.get("OUTLINE_COLOR", (128, 128, 128)))  # Color del borde
-    outline_width = theme_data.get("OUTLINE_WIDTH", 2)  # Grosor del borde
+    filled_color = parse_color(rating_data.get("FILLED_COLOR", (255, 215, 0)))
+    outline_color = parse_color(rating_data.get("OUTLINE_COLOR", (128, 128, 128)))  # Color del borde
+    outline_width = rating_data.get("OUTLINE_WIDTH", 2)  # Grosor del borde
+
+    # Estrellas llena y vacía, dibujadas una sola vez
+    stamp = (star_width, star_height, star_size, filled_color, outline_color, outline_width)
+    full_star = _get_star_stamp(*stamp, True)
+    empty_star = _get_star_stamp(*stamp, False)
 
     # Dibujar las estrellas
     for i in range(stars):
@@ -318,59 +354,23 @@ def display_themed_star_rating(theme_data, value, max_value=10, stars=5):
         # Calcular el "llenado" de esta estrella
         fill_percent = max(0, min(1, filled_stars - i))
 
-        if fill_percent > 0:
-            # Crear una imagen temporal para esta estrella
-            star_img = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
-            star_draw = ImageDraw.Draw(star_img)
-
-            points = _calculate_star_points(star_width//2, star_height//2, star_size//2)
-
-            if fill_percent < 1:
-                # Crear la estrella completa primero
-                complete_star = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
-                complete_draw = ImageDraw.Draw(complete_star)
-                complete_draw.polygon(points, fill=filled_color, outline=outline_color, width=outline_width)
-
-                # Crear la máscara para recortar
-                mask = Image.new('L', (star_width, star_height), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                clip_width = int(star_width * fill_percent)
-                mask_draw.rectangle([0, 0, clip_width, star_height], fill=255)
-
-                # Crear la estrella vacía con solo el contorno
-                empty_star = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
-                empty_draw = ImageDraw.Draw(empty_star)
-                empty_draw.polygon(points, outline=outline_color, fill=(0, 0, 0, 0), width=outline_width)
-
-                # Combinar las partes
-                # 1. Aplicar la máscara a la estrella completa
-                star_filled = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
-                star_filled.paste(complete_star, (0, 0), mask)
-
-                # 2. Crear la máscara inversa
-                mask_inverse = Image.new('L', (star_width, star_height), 255)
-                mask_inverse_draw = ImageDraw.Draw(mask_inverse)
-                mask_inverse_draw.rectangle([0, 0, clip_width, star_height], fill=0)
-
-                # 3. Aplicar la máscara inversa a la estrella vacía
-                star_empty = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
-                star_empty.paste(empty_star, (0, 0), mask_inverse)
-
-                # 4. Combinar ambas partes
-                star_img = Image.alpha_composite(star_filled, star_empty)
-            else:
-                # Para estrellas completamente llenas
-                star_draw.polygon(points, fill=filled_color, outline=outline_color, width=outline_width)
-
-            # Pegar la estrella en la imagen principal
-            image.paste(star_img, (x, y), star_img)
+        if fill_percent >= 1:
+            # Para estrellas completamente llenas
+            image.paste(full_star, (x, y), full_star)
+        elif fill_percent > 0:
+            # Columnas de la estrella llena hasta el llenado, y de la estrella vacía después
+            clip_width = int(star_width * fill_percent) + 1
+            filled_part = full_star.crop((0, 0, clip_width, star_height))
+            empty_part = empty_star.crop((clip_width, 0, star_width, star_height))
+            image.paste(filled_part, (x, y), filled_part)
+            image.paste(empty_part, (x + clip_width, y), empty_part)
         else:
             # Dibujar solo el contorno para estrellas vacías
             points = _calculate_star_points(center_x, center_y, star_size//2)
             draw.polygon(points, outline=outline_color, fill=(0, 0, 0, 0), width=outline_width)
 
     # Mostrar la imagen
-    display.lcd.DisplayPILImage(
+    display.lcd.UpdatePILImage(
         image=image,
         x=left,
         y=upper,
@@ -378,6 +378,21 @@ def display_themed_star_rating(theme_data, value, max_value=10, stars=5):
         image_height=height
     )
 
+
+def _get_star_stamp(star_width, star_height, star_size, filled_color, outline_color, outline_width, filled):
+    """Estrella llena o vacía (solo el contorno) sobre fondo transparente, guardada en la caché de imágenes"""
+    def draw_star():
+        star_img = Image.new('RGBA', (star_width, star_height), (0, 0, 0, 0))
+        points = _calculate_star_points(star_width//2, star_height//2, star_size//2)
+        ImageDraw.Draw(star_img).polygon(points, fill=filled_color if filled else (0, 0, 0, 0),
+                                         outline=outline_color, width=outline_width)
+        return star_img
+
+    return display.lcd.image_cache.get_or_load(
+        ("star", star_width, star_height, star_size, filled_color, outline_color, outline_width, filled), draw_star)
+
+
+@functools.lru_cache(maxsize=64)
 def _calculate_star_points(x_center, y_center, size):
     """Calcula los puntos para dibujar una estrella"""
     points = []
@@ -388,7 +403,7 @@ def _calculate_star_points(x_center, y_center, size):
         x = x_center + r * math.cos(angle)
         y = y_center + r * math.sin(angle)
         points.append((x, y))
-    return points
+    return tuple(points)
 
 
 def save_last_value(value: float, last_values: List[float], history_size: int):
@@ -950,7 +965,7 @@ class Custom:
     @staticmethod
     def stats():
         for custom_stat in config.THEME_DATA['STATS']['CUSTOM']:
-            if custom_stat != "INTERVAL":
+            if custom_stat not in ("INTERVAL", "PHASE"):
 
                 # Load the custom sensor class from sensors_custom.py based on the class name
                 try:
@@ -1020,16 +1035,8 @@ class Weather:
             "SHOW") or whumidity_theme_data.get("SHOW") else False
 
         if activate:
-            temp = None
-            feel = None
-            time = None
-            humidity = None
             if HW_SENSORS in ["STATIC", "STUB"]:
-                temp = "17.5°C"
-                feel = "(17.2°C)"
-                desc = "Cloudy"
-                time = "@15:33"
-                humidity = "45%"
+                Weather.display(("17.5°C", "(17.2°C)", "Cloudy", "@15:33", "45%"))
             else:
                 # API Parameters
                 lat = config.CONFIG_DATA['config'].get('WEATHER_LATITUDE', "")
@@ -1040,39 +1047,54 @@ class Weather:
                 deg = WEATHER_UNITS.get(units, '°?')
                 if api_key:
                     url = f'https://api.openweathermap.org/data/3.0/onecall?lat={lat}&lon={lon}&exclude=minutely,hourly,daily,alerts&appid={api_key}&units={units}&lang={lang}'
-                    try:
-                        response = requests.get(url)
-                        if response.status_code == 200:
-                            data = response.json()
-                            temp = f"{data['current']['temp']:.1f}{deg}"
-                            feel = f"({data['current']['feels_like']:.1f}{deg})"
-                            desc = data['current']['weather'][0]['description'].capitalize()
-                            humidity = f"{data['current']['humidity']:.0f}%"
-                            now = datetime.datetime.now()
-                            time = f"@{now.hour:02d}:{now.minute:02d}"
-                        else:
-                            logger.error(f"Error {response.status_code} fetching OpenWeatherMap API:")
-                            # logger.error(f"Response content: {response.content}")
-                            # logger.error(response.text)
-                            desc = response.json().get('message')
-                    except Exception as e:
-                        logger.error(f"Error fetching OpenWeatherMap API: {str(e)}")
-                        desc = "Error fetching OpenWeatherMap API"
+                    # If the request is slow, previous weather stays displayed until its result is received
+                    weather = slow_providers.read("weather", lambda: Weather.fetch(url, deg),
+                                                  on_late_result=Weather.display)
+                    if weather is not None:
+                        Weather.display(weather)
                 else:
                     logger.warning("No OpenWeatherMap API key provided in config.yaml")
-                    desc = "No OpenWeatherMap API key"
+                    Weather.display((None, None, "No OpenWeatherMap API key", None, None))
 
-        if activate:
-            # Display Temperature
-            display_themed_value(theme_data=wtemperature_theme_data, value=temp)
-            # Display Temperature Felt
-            display_themed_value(theme_data=wfelt_theme_data, value=feel)
-            # Display Update Time
-            display_themed_value(theme_data=wupdatetime_theme_data, value=time)
-            # Display Humidity
-            display_themed_value(theme_data=whumidity_theme_data, value=humidity)
-            # Display Weather Description (or error message)
-            display_themed_value(theme_data=wdescription_theme_data, value=desc)
+    @staticmethod
+    def display(weather):
+        temp, feel, desc, time, humidity = weather
+
+        weather_theme_data = config.THEME_DATA['STATS'].get('WEATHER', {})
+
+        # Display Temperature
+        display_themed_value(theme_data=weather_theme_data.get('TEMPERATURE', {}).get('TEXT', {}), value=temp)
+        # Display Temperature Felt
+        display_themed_value(theme_data=weather_theme_data.get('TEMPERATURE_FELT', {}).get('TEXT', {}), value=feel)
+        # Display Update Time
+        display_themed_value(theme_data=weather_theme_data.get('UPDATE_TIME', {}).get('TEXT', {}), value=time)
+        # Display Humidity
+        display_themed_value(theme_data=weather_theme_data.get('HUMIDITY', {}).get('TEXT', {}), value=humidity)
+        # Display Weather Description (or error message)
+        display_themed_value(theme_data=weather_theme_data.get('WEATHER_DESCRIPTION', {}).get('TEXT', {}),
+                             value=desc)
+
+    @staticmethod
+    def fetch(url: str, deg: str):
+        # Temperature / felt temperature / description (or error message) / update time / humidity
+        try:
+            response = requests.get(url, timeout=WEATHER_TIMEOUT)
+            if response.status_code == 200:
+                data = response.json()
+                now = datetime.datetime.now()
+                return (f"{data['current']['temp']:.1f}{deg}",
+                        f"({data['current']['feels_like']:.1f}{deg})",
+                        data['current']['weather'][0]['description'].capitalize(),
+                        f"@{now.hour:02d}:{now.minute:02d}",
+                        f"{data['current']['humidity']:.0f}%")
+            else:
+                logger.error(f"Error {response.status_code} fetching OpenWeatherMap API:")
+                # logger.error(f"Response content: {response.content}")
+                # logger.error(response.text)
+                return None, None, response.json().get('message'), None, None
+        except Exception as e:
+            logger.error(f"Error fetching OpenWeatherMap API: {str(e)}")
+            return None, None, "Error fetching OpenWeatherMap API", None, None
 
 
 class Ping:
@@ -1080,25 +1102,52 @@ class Ping:
 
     @classmethod
     def stats(cls):
-        theme_data = config.THEME_DATA['STATS']['PING']
+        # If the ping is slow, it is displayed when its reply is received: only received replies are stored in history
+        delay = slow_providers.read("ping", cls.measure, on_late_result=cls.display)
+        if delay is not None:
+            cls.display(delay)
 
+    @staticmethod
+    def measure() -> float:
+        # Delay in ms, or NaN if no reply has been received
         delay = ping(dest_addr=PING_DEST, unit="ms")
+        if delay is None or delay is False:
+            return math.nan
+        return delay
+
+    @classmethod
+    def display(cls, delay: float):
+        theme_data = config.THEME_DATA['STATS']['PING']
 
         save_last_value(delay, cls.last_values_ping,
                         theme_data['LINE_GRAPH'].get("HISTORY_SIZE", DEFAULT_HISTORY_SIZE))
         # logger.debug(f"Ping delay: {delay}ms")
 
-        display_themed_progress_bar(theme_data['GRAPH'], delay)
-        display_themed_radial_bar(
-            theme_data=theme_data['RADIAL'],
-            value=int(delay),
-            unit="ms",
-            min_size=6
-        )
-        display_themed_value(
-            theme_data=theme_data['TEXT'],
-            value=int(delay),
-            unit="ms",
-            min_size=6
-        )
+        if math.isnan(delay):
+            # No reply from the destination
+            display_themed_progress_bar(theme_data['GRAPH'], 0)
+            display_themed_radial_bar(
+                theme_data=theme_data['RADIAL'],
+                value=0,
+                custom_text="No reply"
+            )
+            display_themed_value(
+                theme_data=theme_data['TEXT'],
+                value="No reply",
+                min_size=6
+            )
+        else:
+            display_themed_progress_bar(theme_data['GRAPH'], delay)
+            display_themed_radial_bar(
+                theme_data=theme_data['RADIAL'],
+                value=int(delay),
+                unit="ms",
+                min_size=6
+            )
+            display_themed_value(
+                theme_data=theme_data['TEXT'],
+                value=int(delay),
+                unit="ms",
+                min_size=6
+            )
         display_themed_line_graph(theme_data['LINE_GRAPH'], cls.last_values_ping)
@@ -210,6 +210,11 @@ if __name__ == "__main__":
     # Create all static texts
     display.display_static_text()
 
+    # If compositor is enabled, send static images/text now and start sending a frame periodically
+    if display.lcd.compositor:
+        display.lcd.FlushCompositor()
+        scheduler.DisplayFlush()
+
     # Wait for static images/text to be displayed before starting monitoring (to avoid filling the queue while waiting)
     wait_for_empty_queue(10)
 
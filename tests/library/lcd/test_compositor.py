@@ -0,0 +1,53 @@
+import unittest
+
+from PIL import Image
+
+from library.lcd.compositor import Compositor, merge_boxes
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+from .sample_image import generate_sample_image
+
+
+class TestMergeBoxes(unittest.TestCase):
+    def test_overlapping_and_adjacent_boxes_are_merged(self):
+        boxes = [(0, 0, 10, 10), (5, 0, 15, 10), (15, 0, 20, 10)]
+        self.assertEqual(merge_boxes(boxes), [(0, 0, 20, 10)])
+
+    def test_distant_boxes_are_not_merged(self):
+        boxes = [(0, 0, 10, 10), (100, 100, 110, 110)]
+        self.assertEqual(merge_boxes(boxes, merge_threshold=100), boxes)
+        self.assertEqual(merge_boxes(boxes, merge_threshold=110 * 110), [(0, 0, 110, 110)])
+
+
+class TestCompositor(unittest.TestCase):
+    def test_flush_returns_merged_areas_from_canvas(self):
+        compositor = Compositor(320, 480, merge_threshold=0)
+        compositor.paste(Image.new("RGB", (10, 10), (255, 0, 0)), 0, 0)
+        compositor.paste(Image.new("RGB", (10, 10), (0, 255, 0)), 10, 0)
+
+        flushed = compositor.flush()
+        self.assertEqual(len(flushed), 1)
+        image, x, y = flushed[0]
+        self.assertEqual((x, y, image.size), (0, 0, (20, 10)))
+        self.assertEqual(image.getpixel((5, 5)), (255, 0, 0))
+        self.assertEqual(image.getpixel((15, 5)), (0, 255, 0))
+
+        self.assertEqual(compositor.flush(), [])
+
+
+class TestLcdCommCompositor(unittest.TestCase):
+    def test_images_are_sent_on_flush(self):
+        lcd = MockedLcdCommRevA()
+        lcd.enable_compositor()
+        image = generate_sample_image(100, 50)
+
+        lcd.UpdatePILImage(image, 10, 20)
+        lcd.UpdatePILImage(image, 110, 20)
+        self.assertEqual(len(lcd.lcd_serial.write.mock_calls), 0)
+
+        lcd.FlushCompositor()
+
+        # A single bitmap command for both images: (10, 20) to (209, 69)
+        written = lcd.lcd_serial.write.mock_calls
+        self.assertEqual(len([w for w in written if len(w.args[0]) == 6]), 1)
+        self.assertEqual(sum(len(w.args[0]) for w in written), 6 + 200 * 50 * 2)
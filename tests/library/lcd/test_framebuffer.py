@@ -0,0 +1,80 @@
+import unittest
+
+import numpy as np
+
+from library.lcd.framebuffer import Framebuffer
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+from .sample_image import generate_sample_image
+
+
+class TestFramebuffer(unittest.TestCase):
+    def test_unknown_content_is_dirty(self):
+        fb = Framebuffer(320, 480)
+        rgb = np.zeros((20, 30, 3), dtype=np.uint8)
+
+        self.assertEqual(fb.dirty_rectangles(rgb, 10, 40), [(10, 40, 40, 60)])
+
+    def test_identical_content_is_not_dirty(self):
+        fb = Framebuffer(320, 480)
+        rgb = np.full((20, 30, 3), 127, dtype=np.uint8)
+        fb.update(rgb, 10, 40)
+
+        self.assertEqual(fb.dirty_rectangles(rgb, 10, 40), [])
+
+        fb.invalidate()
+        self.assertEqual(fb.dirty_rectangles(rgb, 10, 40), [(10, 40, 40, 60)])
+
+    def test_changed_pixels_bounding_box(self):
+        fb = Framebuffer(320, 480)
+        rgb = np.zeros((100, 100, 3), dtype=np.uint8)
+        fb.update(rgb, 0, 0)
+
+        rgb = rgb.copy()
+        rgb[10:15, 20:22] = 255
+        rgb[12, 50] = 1
+        self.assertEqual(fb.dirty_rectangles(rgb, 0, 0), [(20, 10, 51, 15)])
+
+    def test_distant_changes_are_split(self):
+        fb = Framebuffer(320, 480, merge_threshold=100)
+        rgb = np.zeros((200, 100, 3), dtype=np.uint8)
+        fb.update(rgb, 0, 0)
+
+        rgb = rgb.copy()
+        rgb[0:2, 0:10] = 255
+        rgb[150:160, 90:100] = 255
+        self.assertEqual(fb.dirty_rectangles(rgb, 0, 0), [(0, 0, 10, 2), (90, 150, 100, 160)])
+
+
+class TestLcdCommFramebuffer(unittest.TestCase):
+    def test_same_image_is_sent_once(self):
+        lcd = MockedLcdCommRevA()
+        lcd.enable_framebuffer()
+        image = generate_sample_image(100, 50)
+
+        lcd.UpdatePILImage(image, 10, 20)
+        writes = len(lcd.lcd_serial.write.mock_calls)
+        self.assertGreater(writes, 0)
+
+        lcd.UpdatePILImage(image, 10, 20)
+        self.assertEqual(len(lcd.lcd_serial.write.mock_calls), writes)
+
+        lcd.invalidate_screen()
+        lcd.UpdatePILImage(image, 10, 20)
+        self.assertEqual(len(lcd.lcd_serial.write.mock_calls), 2 * writes)
+
+    def test_only_changed_area_is_sent(self):
+        lcd = MockedLcdCommRevA()
+        lcd.enable_framebuffer()
+        image = generate_sample_image(100, 50)
+        lcd.UpdatePILImage(image, 10, 20)
+        lcd.lcd_serial.reset_mock()
+
+        image = image.copy()
+        image.putpixel((30, 5), (1, 2, 3))
+        lcd.UpdatePILImage(image, 10, 20)
+
+        # Bitmap command for a single pixel at (40, 25), followed by the pixel data
+        written = lcd.lcd_serial.write.mock_calls
+        self.assertEqual(len(written), 2)
+        self.assertEqual(len(written[1].args[0]), 2)
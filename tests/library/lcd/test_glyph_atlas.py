@@ -0,0 +1,88 @@
+import unittest
+
+from PIL import Image, ImageDraw, ImageFont
+
+from library.lcd.glyph_atlas import GlyphAtlas
+
+from .sample_image import generate_sample_image
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+FONTS = ["res/fonts/roboto-mono/RobotoMono-Regular.ttf", "res/fonts/roboto/Roboto-BlackItalic.ttf",
+         "res/fonts/geforce/GeForce-Bold.ttf"]
+TEXTS = ["12.34%", "98°C", "1011 MHz", "AVA Wo Te", "   "]
+ANCHORS = ["la", "lt", "lm", "ls", "lb", "ld", "mm", "mt", "rt", "rb"]
+
+
+class TestGlyphAtlas(unittest.TestCase):
+    def test_rendering_is_identical_to_freetype(self):
+        background = generate_sample_image(120, 60)
+        transparent_background = background.convert("RGBA")
+        transparent_background.putalpha(Image.linear_gradient("L").resize((120, 60)))
+
+        for font_path in FONTS:
+            for size in [9, 20]:
+                font = ImageFont.truetype(font_path, size)
+                atlas = GlyphAtlas(font)
+                for text in TEXTS:
+                    for anchor in ANCHORS:
+                        for image in [background, transparent_background]:
+                            for xy in [(30, 30), (-5, 55)]:
+                                with self.subTest(font=font_path, size=size, text=text, anchor=anchor,
+                                                  mode=image.mode, xy=xy):
+                                    expected = image.copy()
+                                    ImageDraw.Draw(expected).text(xy, text, font=font, fill=(200, 30, 90),
+                                                                  anchor=anchor)
+                                    drawn = image.copy()
+                                    self.assertTrue(atlas.draw(drawn, xy, text, (200, 30, 90), anchor))
+                                    self.assertEqual(drawn.tobytes(), expected.tobytes())
+
+                                    self.assertEqual(atlas.getbbox(text, anchor), font.getbbox(text, anchor=anchor))
+
+    def test_glyphs_are_rasterized_once(self):
+        atlas = GlyphAtlas(ImageFont.truetype(FONTS[0], 20))
+
+        atlas.getmask("12.34%")
+        glyphs = dict(atlas.glyphs)
+        atlas.getmask("43.21%")
+
+        self.assertEqual(set(glyphs), set("1234.%"))
+        self.assertTrue(all(atlas.glyphs[c] is glyphs[c] for c in glyphs))
+
+    def test_unsupported_texts(self):
+        atlas = GlyphAtlas(ImageFont.truetype(FONTS[0], 20))
+        image = Image.new("RGB", (100, 100))
+
+        for text in ["", "multiline\ntext", "Ω", "→"]:
+            self.assertIsNone(atlas.getmask(text))
+            self.assertFalse(atlas.draw(image, (0, 0), text, (255, 255, 255)))
+        self.assertFalse(atlas.draw(image.convert("L"), (0, 0), "12", (255, 255, 255)))
+        self.assertEqual((atlas.drawn, atlas.unsupported), (0, 5))
+
+    def test_texts_are_identical_to_font_of_lcd(self):
+        # Texts are drawn as ImageDraw.text() with the font opened by open_font(), whatever its layout engine
+        lcd = MockedLcdCommRevA()
+        sent = []
+        lcd.DisplayPILImage = lambda image, *args: sent.append(image)
+
+        for i, text in enumerate(TEXTS + ["→ 42"]):
+            with self.subTest(text=text):
+                lcd.DisplayText(text, 10, 10 + 30 * i, 100, 30, font=FONTS[1], font_size=20, font_color=(200, 30, 90))
+                expected = Image.new("RGB", (100, 30), (255, 255, 255))
+                ImageDraw.Draw(expected).text((0, 0), text, font=lcd.open_font(FONTS[1], 20), fill=(200, 30, 90))
+                self.assertEqual(sent[-1].tobytes(), expected.tobytes())
+
+        atlas = lcd.open_glyph_atlas(FONTS[1], 20)
+        if lcd.open_font(FONTS[1], 20).layout_engine == ImageFont.Layout.BASIC:
+            self.assertEqual((atlas.drawn, atlas.unsupported), (len(TEXTS), 1))
+        else:
+            self.assertIsNone(atlas)
+
+    def test_atlas_is_not_used_with_complex_layout_engine(self):
+        lcd = MockedLcdCommRevA()
+        font = ImageFont.truetype(FONTS[0], 20)
+        font.layout_engine = ImageFont.Layout.RAQM
+        lcd.font_cache[(FONTS[0], 20)] = font
+        self.assertIsNone(lcd.open_glyph_atlas(FONTS[0], 20))
+
+if __name__ == '__main__':
+    unittest.main()
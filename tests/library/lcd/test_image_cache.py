@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+
+from PIL import Image
+
+from library.lcd.image_cache import ImageCache
+
+from .sample_image import generate_sample_image
+
+
+class TestImageCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def save_image(self, name: str, image: Image.Image) -> str:
+        path = os.path.join(self.directory.name, name)
+        image.save(path)
+        return path
+
+    def test_images_are_decoded_once(self):
+        path = self.save_image("background.png", generate_sample_image(30, 20))
+        cache = ImageCache()
+
+        first = cache.open(path)
+        os.remove(path)
+        second = cache.open(path)
+
+        self.assertEqual(first.tobytes(), second.tobytes())
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.size, 30 * 20 * 3)
+
+    def test_modes_are_normalized(self):
+        image = generate_sample_image(30, 20)
+        cache = ImageCache()
+
+        self.assertEqual(cache.get(self.save_image("rgb.png", image)).mode, "RGB")
+        self.assertEqual(cache.get(self.save_image("palette.png", image.quantize(16))).mode, "RGB")
+        self.assertEqual(cache.get(self.save_image("grayscale.png", image.convert("L"))).mode, "RGB")
+        self.assertEqual(cache.get(self.save_image("rgba.png", image.convert("RGBA"))).mode, "RGBA")
+        self.assertEqual(cache.get(self.save_image("gray_alpha.png", image.convert("LA"))).mode, "RGBA")
+
+    def test_cached_image_is_not_modified(self):
+        path = self.save_image("background.png", generate_sample_image(30, 20))
+        cache = ImageCache()
+        expected = cache.get(path).tobytes()
+
+        cache.open(path).paste((0, 0, 0), (0, 0, 30, 20))
+        crop = cache.crop(path, (5, 5, 15, 10))
+        crop.paste((0, 0, 0), (0, 0, 10, 5))
+
+        self.assertEqual(crop.size, (10, 5))
+        self.assertEqual(cache.get(path).tobytes(), expected)
+
+    def test_tiles_are_cropped_once(self):
+        image = generate_sample_image(30, 20)
+        path = self.save_image("background.png", image)
+        cache = ImageCache()
+
+        tile = cache.tile(path, (5, 5, 15, 10))
+        self.assertIs(cache.tile(path, [5, 5, 15, 10]), tile)
+        self.assertEqual(tile.tobytes(), image.crop((5, 5, 15, 10)).tobytes())
+        self.assertIn((path, (5, 5, 15, 10)), cache)
+        self.assertEqual(cache.size, 30 * 20 * 3 + 10 * 5 * 3)
+
+        crop = cache.crop(path, (5, 5, 15, 10))
+        self.assertIsNot(crop, tile)
+        self.assertEqual(crop.tobytes(), tile.tobytes())
+
+    def test_least_recently_used_images_are_evicted(self):
+        paths = [self.save_image(f"{i}.png", generate_sample_image(10, 10)) for i in range(3)]
+        cache = ImageCache(max_bytes=2 * 10 * 10 * 3)
+
+        cache.get(paths[0])
+        cache.get(paths[1])
+        cache.get(paths[0])
+        cache.get(paths[2])
+
+        self.assertIn(paths[0], cache)
+        self.assertNotIn(paths[1], cache)
+        self.assertIn(paths[2], cache)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.size, 2 * 10 * 10 * 3)
+
+    def test_image_bigger_than_limit_is_kept(self):
+        path = self.save_image("background.png", generate_sample_image(30, 20))
+        cache = ImageCache(max_bytes=100)
+
+        cache.get(path)
+        cache.get(path)
+
+        self.assertEqual((cache.hits, cache.misses, cache.evictions), (1, 1, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
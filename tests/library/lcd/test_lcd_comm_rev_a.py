@@ -1,5 +1,7 @@
 import unittest
+from unittest.mock import patch
 
+from library.lcd.lcd_comm import SERIAL_WRITE_SIZE, SERIAL_WRITE_SIZE_DARWIN
 from library.lcd.lcd_comm_rev_a import LcdCommRevA, Orientation
 
 from .serial_mock import new_testing_serial
@@ -82,3 +84,25 @@ class TestLcdCommRevA(unittest.TestCase):
         lcd.DisplayPILImage(sample_img_landscape, x=10, y=20, image_width=100, image_height=200)
 
         lcd.expect_golden(self, "rev_a_display_pil_image_patch_reverse_landscape")
+
+    def test_write_lines(self):
+        lcd = MockedLcdCommRevA()
+        data = bytes(range(256)) * 200
+        with patch("library.lcd.lcd_comm.platform.system", return_value="Linux"):
+            lcd.WriteLines([data[:100], data[100:200], memoryview(data)[200:]])
+
+        written = [call.args[0] for call in lcd.lcd_serial.write.mock_calls]
+        self.assertEqual(b"".join(written), data)
+        self.assertEqual([len(w) for w in written], [SERIAL_WRITE_SIZE] * 3 + [len(data) - 3 * SERIAL_WRITE_SIZE])
+
+    def test_write_lines_darwin(self):
+        # Small writes, each flushed
+        lcd = MockedLcdCommRevA()
+        data = bytes(range(256)) * 20
+        with patch("library.lcd.lcd_comm.platform.system", return_value="Darwin"):
+            lcd.WriteLines([data[:100], memoryview(data)[100:]])
+
+        written = [call.args[0] for call in lcd.lcd_serial.write.mock_calls]
+        self.assertEqual(b"".join(written), data)
+        self.assertEqual([len(w) for w in written], [SERIAL_WRITE_SIZE_DARWIN] * 2)
+        self.assertEqual(len(lcd.lcd_serial.flush.mock_calls), 2)
@@ -0,0 +1,109 @@
+import array
+import math
+import random
+import unittest
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from library.lcd.line_graph import LineGraph
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+
+def draw_line_graph(width, height, line_width, values, min_value, max_value):
+    # Reference: whole line drawn at once
+    image = Image.new("L", (width, height))
+    step = width / len(values)
+    points = []
+    for value in values:
+        if not math.isnan(value):
+            points.append((len(points) * step, height - (value - min_value) * height / (max_value - min_value)))
+    ImageDraw.Draw(image).line(points, fill=255, width=line_width)
+    return image
+
+
+class TestLineGraph(unittest.TestCase):
+    def test_plot_is_identical_to_whole_line(self):
+        rnd = random.Random(0)
+        for width, line_width, count in [(100, 1, 10), (120, 2, 30), (300, 3, 20), (60, 8, 60), (100, 5, 7)]:
+            plot = LineGraph(width, 50, line_width)
+            values = [math.nan] * count
+            for i in range(count + 20):
+                values = values[1:] + [rnd.choice([rnd.uniform(0, 100), 50.0, math.nan])]
+
+                with self.subTest(width=width, line_width=line_width, count=count, i=i):
+                    before = np.asarray(plot.mask).copy()
+                    box = plot.update(np.array(values), 0, 100)
+
+                    expected = draw_line_graph(width, 50, line_width, values, 0, 100)
+                    self.assertEqual(plot.mask.tobytes(), expected.tobytes())
+
+                    # All changed pixels are in the returned area
+                    changed = np.argwhere(before != np.asarray(plot.mask))
+                    if len(changed):
+                        self.assertGreaterEqual(changed[:, 1].min(), box[0])
+                        self.assertLess(changed[:, 1].max(), box[2])
+
+    def test_changed_area(self):
+        plot = LineGraph(100, 50, 2)
+        self.assertEqual(plot.update(np.array([math.nan] * 8 + [10, 20]), 0, 100), (0, 0, 100, 50))
+        self.assertIsNone(plot.update(np.array([math.nan] * 8 + [10, 20]), 0, 100))
+
+        # New value: only the new segment is drawn
+        self.assertEqual(plot.update(np.array([math.nan] * 7 + [10, 20, 30]), 0, 100), (7, 0, 24, 50))
+
+        # New scale: whole plot is drawn
+        self.assertEqual(plot.update(np.array([math.nan] * 7 + [10, 20, 30]), 0, 50), (0, 0, 100, 50))
+
+
+class TestLcdCommLineGraph(unittest.TestCase):
+    def setUp(self):
+        self.lcd = MockedLcdCommRevA()
+        self.sent = []
+        self.lcd.DisplayPILImage = lambda image, x, y, *args: self.sent.append((image.copy(), x, y))
+
+    def test_only_changed_area_is_sent(self):
+        values = [math.nan] * 9 + [42]
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.assertEqual([(image.size, x, y) for image, x, y in self.sent], [((100, 50), 10, 20)])
+
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.assertEqual(len(self.sent), 1)
+
+        values = values[1:] + [43]
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.assertEqual(len(self.sent), 2)
+        image, x, y = self.sent[1]
+        self.assertLess(image.size[0], 100)
+
+        # Screen content is the graph drawn entirely
+        screen = self.sent[0][0].copy()
+        screen.paste(image, (x - 10, y - 20))
+        self.lcd.invalidate_screen()
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.assertEqual(self.sent[2][0].tobytes(), screen.tobytes())
+
+    def test_overwritten_graph_is_sent_again(self):
+        values = [math.nan] * 9 + [42]
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.lcd.UpdatePILImage(Image.new("RGB", (10, 10)), 100, 60)
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values)
+        self.assertEqual(self.sent[2][0].size, (100, 50))
+
+        self.lcd.DisplayLineGraph(10, 20, 100, 50, values, line_color=(255, 0, 0))
+        self.assertEqual(self.sent[3][0].size, (100, 50))
+
+    def test_values_as_array(self):
+        values = [math.nan] * 5 + [42, 50, 12.5, 70, math.nan, 64]
+        for autoscale in [False, True]:
+            for history in [values, np.array(values), memoryview(array.array('d', values))]:
+                self.lcd.invalidate_screen()
+                self.lcd.DisplayLineGraph(10, 20, 100, 50, history, autoscale=autoscale)
+            self.assertEqual(self.sent[-1][0].tobytes(), self.sent[-3][0].tobytes())
+            self.assertEqual(self.sent[-2][0].tobytes(), self.sent[-3][0].tobytes())
+        self.assertNotEqual(self.sent[0][0].tobytes(), self.sent[-1][0].tobytes())
+
+
+if __name__ == '__main__':
+    unittest.main()
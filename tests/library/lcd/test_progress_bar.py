@@ -0,0 +1,53 @@
+import unittest
+
+from PIL import Image
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+
+class TestProgressBar(unittest.TestCase):
+    def setUp(self):
+        self.lcd = MockedLcdCommRevA()
+        self.screen = Image.new("RGB", (self.lcd.get_width(), self.lcd.get_height()))
+        self.sent = []
+
+        def display(image, x, y, *args):
+            self.screen.paste(image, (x, y))
+            self.sent.append((image.size, x, y))
+
+        self.lcd.DisplayPILImage = display
+
+    def bar(self, value, **kwargs):
+        # Bitmap of the whole progress bar, drawn from scratch
+        self.lcd.invalidate_screen()
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=value, **kwargs)
+        return self.screen.crop((10, 20, 110, 35)).tobytes()
+
+    def test_only_changed_columns_are_sent(self):
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=42)
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=42.5)
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=60)
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=30)
+        self.assertEqual(self.sent, [((100, 15), 10, 20), ((18, 15), 52, 20), ((30, 15), 40, 20)])
+
+        displayed = self.screen.crop((10, 20, 110, 35)).tobytes()
+        self.assertEqual(displayed, self.bar(30))
+        self.assertNotEqual(displayed, self.bar(60))
+
+    def test_changed_bar_is_sent_again(self):
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=42)
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=60, bar_color=(255, 0, 0))
+        self.lcd.UpdatePILImage(Image.new("RGB", (10, 10)), 100, 30)
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=60, bar_color=(255, 0, 0))
+        self.assertEqual([size for size, _, _ in self.sent], [(100, 15), (100, 15), (10, 10), (100, 15)])
+
+    def test_bar_bitmaps_are_drawn_once(self):
+        self.lcd.DisplayProgressBar(10, 20, 100, 15, value=42)
+        misses = self.lcd.image_cache.misses
+        for value in range(100):
+            self.lcd.DisplayProgressBar(10, 20, 100, 15, value=value)
+        self.assertEqual(self.lcd.image_cache.misses, misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import time
+import unittest
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+
+class TestRadialProgressBar(unittest.TestCase):
+    def setUp(self):
+        self.lcd = MockedLcdCommRevA()
+        self.sent = []
+        self.lcd.UpdatePILImage = lambda image, x, y, *args: self.sent.append(image.tobytes())
+
+    def test_bar_is_drawn_once_per_value(self):
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42, angle_sep=0)
+        misses = self.lcd.image_cache.misses
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42, angle_sep=0)
+        self.assertEqual(self.lcd.image_cache.misses, misses)
+        self.assertEqual(self.sent[0], self.sent[1])
+
+        # Text is drawn over the bitmap from the cache, which is not modified
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42, angle_sep=0, text="abc")
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42, angle_sep=0)
+        self.assertNotEqual(self.sent[2], self.sent[0])
+        self.assertEqual(self.sent[3], self.sent[0])
+
+        # Values that are not integers are not cached
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42.5, angle_sep=0)
+        self.assertEqual(self.lcd.image_cache.misses, misses)
+
+    def test_all_values_are_drawn_in_background(self):
+        self.lcd.radial_prerender = True
+        self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=42, min_value=10, max_value=60)
+
+        deadline = time.monotonic() + 10
+        while len(self.lcd.image_cache.images) < 51 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(len(self.lcd.image_cache.images), 51)
+
+        misses = self.lcd.image_cache.misses
+        for value in range(10, 61):
+            self.lcd.DisplayRadialProgressBar(100, 100, 50, 10, value=value, min_value=10, max_value=60)
+        self.assertEqual(self.lcd.image_cache.misses, misses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+
+import numpy as np
+from PIL import Image
+
+from library.lcd.serialize import image_to_RGB565, image_to_RGB565_lut, chunked, join_chunks
+
+from .sample_image import generate_sample_image
+
+
+class TestSerialize(unittest.TestCase):
+    def test_image_to_RGB565(self):
+        image = Image.new("RGB", (2, 1))
+        image.putpixel((0, 0), (0xFF, 0x00, 0x80))
+        image.putpixel((1, 0), (0x12, 0x34, 0x56))
+
+        self.assertEqual(bytes(image_to_RGB565(image, "big")), bytes.fromhex("f810 11aa"))
+        self.assertEqual(bytes(image_to_RGB565(image, "little")), bytes.fromhex("10f8 aa11"))
+
+    def test_image_to_RGB565_reuses_buffer(self):
+        image = generate_sample_image(30, 20)
+        expected = bytes(image_to_RGB565(image, "little"))
+
+        out = bytearray(30 * 20 * 2 + 10)
+        serialized = image_to_RGB565(image, "little", out)
+        self.assertEqual(serialized, expected)
+        self.assertEqual(serialized.obj, out)
+
+        # Chunks are views on the buffer
+        chunks = list(chunked(serialized, 100))
+        self.assertEqual(b"".join(chunks), expected)
+        self.assertTrue(all(chunk.obj is out for chunk in chunks))
+
+    def test_image_to_RGB565_lut(self):
+        image = generate_sample_image(30, 20)
+
+        for endianness in ["big", "little"]:
+            self.assertEqual(image_to_RGB565_lut(image, endianness), image_to_RGB565(image, endianness))
+
+    def test_palette_image_to_RGB565(self):
+        image = generate_sample_image(30, 20)
+
+        for converted in [image.quantize(16), image.convert("L")]:
+            self.assertEqual(image_to_RGB565(converted, "big"), image_to_RGB565(converted.convert("RGB"), "big"))
+
+    def test_join_chunks(self):
+        for size in [0, 1, 248, 249, 250, 498, 1000]:
+            data = (bytes(range(256)) * 4)[:size]
+            self.assertEqual(join_chunks(np.frombuffer(data, dtype=np.uint8), 249), b"\x00".join(chunked(data, 249)))
+
+    def test_join_chunks_padding(self):
+        data = np.ones(500, dtype=np.uint8)
+        joined = b"\x01" * 249 + b"\x00" + b"\x01" * 249 + b"\x00" + b"\x01" * 2
+        self.assertEqual(join_chunks(data, 249, size=750), joined + b"\x00" * 248)
+
+    def test_image_to_RGB565_rotated(self):
+        image = generate_sample_image(30, 20)
+
+        for quarter_turns in range(4):
+            rotated = image.rotate(quarter_turns * 90, expand=True)
+            self.assertEqual(image_to_RGB565(image, "big", quarter_turns=quarter_turns),
+                             image_to_RGB565(rotated, "big"))
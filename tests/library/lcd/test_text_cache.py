@@ -0,0 +1,69 @@
+import unittest
+
+from PIL import Image
+
+from library.lcd.text_cache import TextCache
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+
+class TestTextCache(unittest.TestCase):
+    def test_least_recently_used_texts_are_evicted(self):
+        cache = TextCache(max_entries=2)
+        image = Image.new("RGB", (10, 10))
+
+        cache.put("a", image, 0, 0)
+        cache.put("b", image, 0, 0)
+        cache.get("a")
+        cache.put("c", image, 0, 0)
+
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+
+    def test_overwritten_texts_are_forgotten(self):
+        cache = TextCache()
+        cache.set_displayed("cpu", "42%", (10, 10, 50, 30))
+        cache.set_displayed("gpu", "12%", (10, 40, 50, 60))
+
+        cache.forget((0, 25, 5, 100))
+        cache.forget((45, 25, 100, 35))
+
+        self.assertFalse(cache.is_displayed("cpu", "42%"))
+        self.assertTrue(cache.is_displayed("gpu", "12%"))
+        self.assertEqual(cache.skipped, 1)
+
+
+class TestLcdCommTextCache(unittest.TestCase):
+    def setUp(self):
+        self.lcd = MockedLcdCommRevA()
+        self.sent = []
+        self.lcd.DisplayPILImage = lambda image, x, y, *args: self.sent.append((image.tobytes(), x, y))
+
+    def test_unchanged_text_is_not_sent_again(self):
+        self.lcd.DisplayText("42%", 10, 20)
+        self.lcd.DisplayText("42%", 10, 20)
+        self.assertEqual(len(self.sent), 1)
+
+        self.lcd.DisplayText("43%", 10, 20)
+        self.lcd.DisplayText("42%", 10, 20)
+        self.assertEqual(len(self.sent), 3)
+        self.assertEqual(self.sent[2], self.sent[0])
+        self.assertEqual(self.lcd.text_cache.hits, 1)
+
+        self.lcd.DisplayText("42%", 10, 20, font_color=(255, 0, 0))
+        self.assertEqual(len(self.sent), 4)
+
+    def test_overwritten_text_is_sent_again(self):
+        self.lcd.DisplayText("42%", 10, 20)
+        self.lcd.UpdatePILImage(Image.new("RGB", (10, 10)), 15, 25)
+        self.lcd.DisplayText("42%", 10, 20)
+        self.assertEqual(len(self.sent), 3)
+
+        self.lcd.invalidate_screen()
+        self.lcd.DisplayText("42%", 10, 20)
+        self.assertEqual(len(self.sent), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
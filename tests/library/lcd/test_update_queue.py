@@ -0,0 +1,90 @@
+import queue
+import unittest
+
+from library.lcd.update_queue import UpdateQueue
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+from .sample_image import generate_sample_image
+
+
+def drain(update_queue: UpdateQueue):
+    while not update_queue.empty():
+        f, args = update_queue.get()
+        f(*args)
+
+
+class TestUpdateQueue(unittest.TestCase):
+    def test_batch_is_queued_at_the_end(self):
+        update_queue = UpdateQueue()
+        with update_queue.batch():
+            update_queue.put((print, [b"1"]))
+            update_queue.put((print, [b"2"]))
+            self.assertTrue(update_queue.empty())
+        update_queue.put((print, [b"3"]))
+
+        self.assertEqual(update_queue.qsize(), 3)
+        self.assertEqual([update_queue.get()[1] for _ in range(3)], [[b"1"], [b"2"], [b"3"]])
+        self.assertRaises(queue.Empty, update_queue.get, block=False)
+
+    def test_queue_is_limited_in_bytes(self):
+        update_queue = UpdateQueue(max_bytes=100)
+
+        # A batch bigger than the limit is accepted in an empty queue
+        with update_queue.batch():
+            update_queue.put((print, [bytes(150)]))
+        with self.assertRaises(queue.Full):
+            with update_queue.batch(timeout=0.01):
+                update_queue.put((print, [bytes(10)]))
+
+        # Single requests are never blocked
+        update_queue.put((print, [bytes(10)]))
+        self.assertEqual(update_queue.qsize(), 2)
+
+    def test_outdated_bitmaps_are_replaced(self):
+        update_queue = UpdateQueue()
+        done = []
+
+        with update_queue.batch((10, 10, 20, 20)):
+            update_queue.put((print, [b"old"]))
+            update_queue.add_done_callback(lambda: done.append(1))
+        with update_queue.batch((50, 50, 60, 60)):
+            update_queue.put((print, [b"other"]))
+
+        # New bitmap redraws the first one entirely: it takes its place
+        with update_queue.batch((0, 0, 30, 30)):
+            update_queue.put((print, [b"new"]))
+
+        self.assertEqual(done, [1])
+        self.assertEqual(update_queue.dropped, 1)
+        self.assertEqual([update_queue.get()[1][0] for _ in range(2)], [b"new", b"other"])
+
+    def test_replacing_bitmap_is_sent_after_overlapping_bitmaps(self):
+        update_queue = UpdateQueue()
+
+        with update_queue.batch((10, 10, 20, 20)):
+            update_queue.put((print, [b"old"]))
+        with update_queue.batch((15, 15, 60, 60)):
+            update_queue.put((print, [b"overlapping"]))
+        with update_queue.batch((10, 10, 20, 20)):
+            update_queue.put((print, [b"new"]))
+
+        self.assertEqual([update_queue.get()[1][0] for _ in range(2)], [b"overlapping", b"new"])
+
+
+class TestLcdCommUpdateQueue(unittest.TestCase):
+    def test_queued_bitmap_is_identical(self):
+        image = generate_sample_image(100, 50)
+
+        lcd = MockedLcdCommRevA()
+        lcd.UpdatePILImage(image, 10, 20)
+        expected = [bytes(call.args[0]) for call in lcd.lcd_serial.write.mock_calls]
+
+        lcd = MockedLcdCommRevA(update_queue=UpdateQueue())
+        for _ in range(3):
+            lcd.lcd_serial.reset_mock()
+            lcd.UpdatePILImage(image, 10, 20)
+            drain(lcd.update_queue)
+            self.assertEqual([bytes(call.args[0]) for call in lcd.lcd_serial.write.mock_calls], expected)
+
+        # Serialization buffers have been released once the bitmaps have been sent
+        self.assertEqual(len(lcd.free_serialize_buffers), 2)
@@ -0,0 +1,70 @@
+import unittest
+
+from PIL import Image
+
+from library.lcd.widget_states import WidgetStates
+
+from .test_lcd_comm_rev_a import MockedLcdCommRevA
+
+
+def draw(states, widget, state, box=(0, 0, 10, 10)):
+    # Update a widget, and draw it in this area if it must be redrawn
+    if not states.update(widget, state):
+        return False
+    with states.draw(widget):
+        states.overwritten(box)
+    return True
+
+
+class TestWidgetStates(unittest.TestCase):
+    def test_unchanged_widgets_are_not_redrawn(self):
+        states = WidgetStates()
+
+        self.assertTrue(draw(states, "cpu", {"value": 42}))
+        self.assertFalse(draw(states, "cpu", {"value": 42}))
+        self.assertTrue(draw(states, "gpu", {"value": 42}, (20, 0, 30, 10)))
+        self.assertTrue(draw(states, "cpu", {"value": 43}))
+        self.assertEqual((states.drawn, states.suppressed), (3, 1))
+
+        states.forget("cpu")
+        self.assertTrue(draw(states, "cpu", {"value": 43}))
+
+    def test_widgets_without_area_are_redrawn(self):
+        # Nothing has been displayed for this widget, e.g. its bitmap was already on the screen
+        states = WidgetStates()
+        self.assertTrue(states.update("cpu", {"value": 42}))
+        self.assertTrue(states.update("cpu", {"value": 42}))
+
+    def test_overwritten_widgets_are_redrawn(self):
+        states = WidgetStates()
+        draw(states, "cpu", {"value": 42}, (0, 0, 10, 10))
+        draw(states, "cpu", {"value": 43}, (0, 0, 5, 10))  # Widget only sends the area that changed
+        draw(states, "gpu", {"value": 42}, (20, 0, 30, 10))
+
+        # Bitmap drawn over the part of the widget that has not been sent again
+        states.overwritten((8, 8, 12, 12))
+        self.assertTrue(draw(states, "cpu", {"value": 43}))
+        self.assertFalse(draw(states, "gpu", {"value": 42}))
+
+    def test_widgets_are_redrawn_when_screen_is_invalidated(self):
+        lcd = MockedLcdCommRevA()
+        draw(lcd.widget_states, "cpu", {"value": 42})
+
+        lcd.invalidate_screen()
+        self.assertTrue(lcd.widget_states.update("cpu", {"value": 42}))
+
+    def test_widgets_are_redrawn_when_overwritten_by_an_image(self):
+        lcd = MockedLcdCommRevA()
+        lcd.DisplayPILImage = lambda *args: None
+
+        self.assertTrue(lcd.widget_states.update("cpu", {"value": 42}))
+        with lcd.widget_states.draw("cpu"):
+            lcd.UpdatePILImage(Image.new("RGB", (20, 10)), 10, 20)
+        self.assertFalse(lcd.widget_states.update("cpu", {"value": 42}))
+
+        lcd.UpdatePILImage(Image.new("RGB", (10, 10)), 25, 25)
+        self.assertTrue(lcd.widget_states.update("cpu", {"value": 42}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import time
+import unittest
+
+from library.sensors.sensor_snapshot import SensorSnapshot
+
+
+class TestSensorSnapshot(unittest.TestCase):
+    def test_recent_readings_are_reused(self):
+        snapshot = SensorSnapshot(ttl=0.2)
+        readings = []
+
+        def read():
+            readings.append(time.monotonic())
+            return len(readings)
+
+        self.assertEqual(snapshot.read("memory", read), 1)
+        self.assertEqual(snapshot.read("memory", read), 1)
+        self.assertEqual(snapshot.read("disk", lambda: "disk"), "disk")
+
+        time.sleep(0.25)
+        self.assertEqual(snapshot.read("memory", read), 2)
+        self.assertEqual((snapshot.hits, snapshot.misses), (1, 3))
+
+    def test_concurrent_readings_are_done_once(self):
+        snapshot = SensorSnapshot()
+        readings = []
+
+        def read():
+            readings.append(None)
+            time.sleep(0.05)
+            return "cpu"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(snapshot.read("cpu", read))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results, ["cpu"] * 4)
+        self.assertEqual(len(readings), 1)
+
+    def test_failed_readings_are_not_kept(self):
+        snapshot = SensorSnapshot()
+
+        def fail():
+            raise OSError()
+
+        self.assertRaises(OSError, snapshot.read, "fans", fail)
+        self.assertEqual(snapshot.read("fans", lambda: "fans"), "fans")
+
+
+if __name__ == '__main__':
+    unittest.main()
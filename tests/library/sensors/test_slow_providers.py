@@ -0,0 +1,68 @@
+import threading
+import unittest
+
+from library.sensors.slow_providers import SlowProviders
+
+
+class TestSlowProviders(unittest.TestCase):
+    def setUp(self):
+        self.providers = SlowProviders(timeout=0.05)
+        self.release = threading.Event()
+        self.calls = 0
+
+    def tearDown(self):
+        self.release.set()
+        self.providers.workers.shutdown(wait=True)
+
+    def read(self, value):
+        def read():
+            self.calls += 1
+            self.release.wait()
+            return value
+
+        return read
+
+    def test_fast_reading(self):
+        self.release.set()
+        self.assertEqual(self.providers.read("key", self.read(42)), 42)
+        self.assertEqual(self.providers.read("key", self.read(43)), 43)
+        self.assertEqual(self.providers.timeouts, 0)
+
+    def test_slow_reading_returns_previous_result(self):
+        self.assertEqual(self.providers.read("key", self.read(42), default=0), 0)
+
+        # Reading still in progress: no other reading is started
+        self.assertEqual(self.providers.read("key", self.read(43), default=0), 0)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(self.providers.timeouts, 2)
+
+        # Reading completed in the background
+        self.release.set()
+        self.providers.readings["key"].result()
+        self.release.clear()
+        self.assertEqual(self.providers.read("key", self.read(44), default=0), 42)
+        self.assertEqual(self.calls, 2)
+
+    def test_late_result_is_passed(self):
+        late_results = []
+        self.assertIsNone(self.providers.read("key", self.read(42), on_late_result=late_results.append))
+        self.assertIsNone(self.providers.read("key", self.read(43), on_late_result=late_results.append))
+        self.assertEqual(late_results, [])
+
+        # Result is passed once, and is not returned again as a new reading
+        self.release.set()
+        self.providers.readings["key"].result()
+        self.providers.workers.shutdown(wait=True)
+        self.assertEqual(late_results, [42])
+
+    def test_exceptions_are_raised(self):
+        def read():
+            raise ValueError()
+
+        self.assertRaises(ValueError, self.providers.read, "key", read)
+        self.release.set()
+        self.assertEqual(self.providers.read("key", self.read(42)), 42)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+import unittest
+
+from library.job_scheduler import Scheduler, _is_stable
+
+
+class TestScheduler(unittest.TestCase):
+    def setUp(self):
+        self.stopping = False
+        self.scheduler = Scheduler(workers=2, stopping=lambda: self.stopping)
+        self.addCleanup(self.stop)
+
+    def stop(self):
+        self.stopping = True
+        self.scheduler.workers.shutdown(wait=True)
+
+    def add_job(self, interval, count, durations=(), **kwargs):
+        # Add a job taking durations[i] seconds for its run i, and return the start times of its first runs
+        runs = []
+        done = threading.Event()
+
+        def job():
+            runs.append(time.monotonic())
+            if len(runs) == count:
+                done.set()
+            if len(runs) <= len(durations):
+                time.sleep(durations[len(runs) - 1])
+
+        self.scheduler.add(job, interval, **kwargs)
+        return runs, done
+
+    def wait(self, done):
+        self.assertTrue(done.wait(timeout=10))
+
+    def test_jobs_run_periodically(self):
+        start = time.monotonic()
+        runs, done = self.add_job(0.05, 5)
+        self.wait(done)
+        self.assertLess(runs[0] - start, 0.02)
+        for previous, run in zip(runs, runs[1:]):
+            self.assertAlmostEqual(run - previous, 0.05, delta=0.02)
+
+        statistics = self.scheduler.get_statistics()["job"]
+        self.assertEqual(statistics["interval"], 0.05)
+        self.assertGreaterEqual(statistics["runs"], 4)
+
+    def test_blocked_job_does_not_delay_others(self):
+        blocked = threading.Event()
+        self.addCleanup(blocked.set)
+        self.scheduler.add(blocked.wait, 0.05)
+
+        runs, done = self.add_job(0.05, 5)
+        self.wait(done)
+        self.assertLess(runs[-1] - runs[0], 0.3)
+
+    def test_deadlines_do_not_drift(self):
+        # Runs take a part of the interval: next runs are still on the deadlines of the first one
+        runs, done = self.add_job(0.05, 20, durations=[0.02] * 20)
+        self.wait(done)
+        for i, run in enumerate(runs):
+            self.assertAlmostEqual(run - runs[0], i * 0.05, delta=0.025)
+
+    def test_late_job_runs_once(self):
+        # First run ends 5.5 intervals after its deadline: the job runs once right away for the last passed deadline,
+        # then at the next deadlines, instead of running for all the deadlines it has missed
+        runs, done = self.add_job(0.05, 4, durations=[0.275])
+        self.wait(done)
+        self.assertAlmostEqual(runs[1] - runs[0], 0.275, delta=0.02)
+        self.assertAlmostEqual(runs[2] - runs[0], 0.30, delta=0.02)
+        self.assertAlmostEqual(runs[3] - runs[0], 0.35, delta=0.02)
+        self.assertEqual(self.scheduler.get_statistics()["job"]["skipped"], 4)
+
+    def test_phase(self):
+        # Runs can start late when the machine is busy: phases are far enough apart to be told from each other
+        runs, done = self.add_job(0.2, 5, phase=0.05)
+        other_runs, other_done = self.add_job(0.2, 5, phase=0.15)
+        self.wait(done)
+        self.wait(other_done)
+        for run in runs:
+            self.assertLess((run - self.scheduler.start_time - 0.05) % 0.2, 0.05)
+        for run in other_runs:
+            self.assertLess((run - self.scheduler.start_time - 0.15) % 0.2, 0.05)
+
+        latency = self.scheduler.get_statistics()["job"]["latency"]
+        self.assertGreaterEqual(sum(latency["buckets"].values()), 5)
+        self.assertLess(latency["max"], 0.05)
+
+    def test_adaptive_interval(self):
+        self.stop()
+        self.stopping = False
+        self.scheduler = Scheduler(workers=2, adaptive_max_interval=0.08, adaptive_threshold=5,
+                                   stopping=lambda: self.stopping)
+
+        # Job reads a stable value, which changes on its 6th run
+        history = [math.nan] * 10
+        intervals = []
+        done = threading.Event()
+
+        def job():
+            intervals.append(self.scheduler.get_statistics()["job"]["interval"])
+            history.append(50 if len(intervals) < 6 else 80)
+            history.pop(0)
+            if len(intervals) == 8:
+                done.set()
+
+        self.scheduler.add(job, 0.01, histories=[history])
+        self.wait(done)
+
+        # Interval doubles up to the maximum interval while the value is stable, and is reset as soon as it changes
+        self.assertEqual([round(interval, 3) for interval in intervals],
+                         [0.01, 0.01, 0.02, 0.04, 0.08, 0.08, 0.01, 0.02])
+
+    def test_is_stable(self):
+        self.assertTrue(_is_stable([math.nan] * 5, 5))
+        self.assertTrue(_is_stable([100, 50, 52], 5))
+        self.assertFalse(_is_stable([100, 50, 56], 5))
+        self.assertFalse(_is_stable([math.nan, math.nan, 50], 5))
+        self.assertFalse(_is_stable([50, math.nan], 5))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# turing-smart-screen-python - a Python system monitor and library for USB-C displays like Turing Smart Screen or XuanFang
+# https://github.com/mathoudebine/turing-smart-screen-python/
+
+# Copyright (C) 2021-2023  Matthieu Houdebine (mathoudebine)
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+# benchmark-serialize.py: Measure the throughput of the bitmap serialization functions, for full-screen frames of all
+# supported display sizes. Run from the project root directory: python tools/benchmark-serialize.py
+
+import os
+import sys
+import timeit
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from library.lcd.serialize import image_to_RGB565, image_to_RGB565_lut, fastest_image_to_RGB565
+
+# Full-screen frame sizes for 3.5", 5" and 8.8" displays
+FRAME_SIZES = [(320, 480), (480, 800), (1920, 480)]
+
+# Minimum duration of each measure, in seconds
+MIN_DURATION = 0.5
+
+
+def benchmark(name: str, serialize, image: Image.Image):
+    serialized_size = len(serialize(image))
+
+    # Find a number of iterations that takes at least MIN_DURATION, then keep the best of 3 measures
+    timer = timeit.Timer(lambda: serialize(image))
+    iterations, _ = timer.autorange()
+    iterations = max(iterations, int(iterations * MIN_DURATION / 0.2))
+    duration = min(timer.repeat(repeat=3, number=iterations)) / iterations
+
+    print(f"  {name:<40} {duration * 1000:8.3f} ms/frame {serialized_size / duration / 1e6:10.1f} MB/s")
+
+
+if __name__ == "__main__":
+    for width, height in FRAME_SIZES:
+        pixels = np.random.default_rng(0).integers(0, 256, (height, width, 3), dtype=np.uint8)
+        image = Image.fromarray(pixels, "RGB")
+        out = bytearray(width * height * 2)
+
+        print(f"{width}x{height}:")
+        benchmark("image_to_RGB565 (new buffer)", lambda im: image_to_RGB565(im, "little"), image)
+        benchmark("image_to_RGB565 (reused buffer)", lambda im: image_to_RGB565(im, "little", out), image)
+        benchmark("image_to_RGB565_lut (reused buffer)", lambda im: image_to_RGB565_lut(im, "little", out), image)
+
+        palette_image = image.quantize(256)
+        benchmark("image_to_RGB565 (palette image)", lambda im: image_to_RGB565(im, "little", out), palette_image)
+
+    print(f"Fastest serialization selected at runtime: {fastest_image_to_RGB565().__name__}")